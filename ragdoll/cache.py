@@ -0,0 +1,406 @@
+"""Record a simulation to disk, and play it back without the solver
+
+A cache is a single file next to the Maya scene, holding the world matrix
+of every rigid for every frame. It is read via a memory map, such that
+opening a cache is instant regardless of its size and any one frame may be
+read without reading those before it.
+
+Playback replaces the outputs of each rigid with animation curves keyed
+from the cache, and disables the solver until the cache is detached.
+The curves are part of the Maya scene, such that playback is evaluated
+by Maya like any other animation and is saved along with the scene.
+
+    from ragdoll import cache
+    cache.record(scene)
+    cache.attach(scene)
+    cache.detach(scene)
+
+Layout
+
+    header      "<4sIiIII"  magic, version, start, frames, rigids, len(names)
+    names       JSON list of rigid paths, padded to 8 bytes
+    matrices    frames x rigids x 16 doubles
+
+"""
+
+import os
+import json
+import mmap
+import struct
+import logging
+
+from maya import cmds
+from maya.api import OpenMayaAnim as oma
+from .vendor import cmdx
+from . import (
+    commands,
+    internal as i__
+)
+
+log = logging.getLogger("ragdoll")
+
+Magic = b"RDCH"
+Version = 1
+Header = struct.Struct("<4sIiIII")
+Matrix = struct.Struct("<16d")
+
+# Outputs of each rigid, redirected to the cache during playback
+Outputs = (
+    "outputTranslateX",
+    "outputTranslateY",
+    "outputTranslateZ",
+    "outputRotateX",
+    "outputRotateY",
+    "outputRotateZ",
+)
+
+
+def default_path(scene):
+    """Return where to store the cache of `scene`, next to the Maya scene"""
+    fname = cmds.file(query=True, sceneName=True)
+
+    if fname:
+        dirname, basename = os.path.split(fname)
+        basename = os.path.splitext(basename)[0]
+    else:
+        dirname = cmds.workspace(query=True, rootDirectory=True)
+        basename = "untitled"
+
+    return os.path.join(dirname, "%s_%s.rcache" % (basename, scene.name()))
+
+
+@i__.with_refresh_suspended
+@i__.with_timing
+def record(scene, start=None, end=None, path=None):
+    """Simulate `scene` from `start` to `end` and write the result to `path`
+
+    Arguments:
+        scene (rdScene): Record the rigids of this scene
+        start (int, optional): First frame, defaults to scene start time
+        end (int, optional): Last frame, defaults to end of playback
+        path (str, optional): Destination, defaults to next to the scene
+
+    Returns:
+        path (str): Absolute path to the written cache
+
+    """
+
+    assert scene.type() == "rdScene", "%s was not a rdScene" % scene
+    assert "cachePath" not in scene, (
+        "%s is playing back a cache, detach it first" % scene
+    )
+
+    if start is None:
+        start = scene["startTime"].read(unit=cmdx.TimeUiUnit())
+
+    if end is None:
+        end = oma.MAnimControl.maxTime().value
+
+    start, end = int(start), int(end)
+    assert end >= start, "%d came before %d" % (end, start)
+
+    path = path or default_path(scene)
+    rigids = i__.node_index.members(scene, "rdRigid")
+    names = json.dumps([rigid.path() for rigid in rigids]).encode("utf-8")
+    names += b" " * (-len(names) % 8)
+
+    plugs = [rigid.parent()["worldMatrix"][0] for rigid in rigids]
+    initial_time = cmds.currentTime(query=True)
+
+    with open(path, "wb") as f:
+        f.write(Header.pack(Magic, Version, start,
+                            end - start + 1, len(rigids), len(names)))
+        f.write(names)
+
+        # The solver only moves forwards, one frame at a time
+        try:
+            for frame in range(start, end + 1):
+                cmds.currentTime(frame, update=True)
+
+                f.write(b"".join(
+                    Matrix.pack(*plug.asMatrix()) for plug in plugs
+                ))
+
+        finally:
+            cmds.currentTime(initial_time, update=True)
+
+    log.info("Cached %d rigids over %d frames to %s" % (
+        len(rigids), end - start + 1, path))
+
+    return path
+
+
+class Cache(object):
+    """Read-only view of a cache on disk
+
+    Arguments:
+        path (str): Absolute path to a file written by :func:`record`
+
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0,
+                              access=mmap.ACCESS_READ)
+
+        magic, version, start, frames, count, length = (
+            Header.unpack_from(self._map, 0)
+        )
+
+        if magic != Magic or version > Version:
+            self.close()
+            raise ValueError("%s was not a Ragdoll cache" % path)
+
+        names = self._map[Header.size:Header.size + length]
+
+        self.path = path
+        self.start = start
+        self.end = start + frames - 1
+        self.names = json.loads(names.decode("utf-8"))
+        self._offset = Header.size + length
+        self._stride = Matrix.size * count
+
+    def __len__(self):
+        return self.end - self.start + 1
+
+    def __repr__(self):
+        return "Cache(\"%s\")" % self.path
+
+    def matrices(self, frame):
+        """Return the world matrix of each rigid at `frame`
+
+        Frames outside of the cache return the nearest frame inside it.
+
+        """
+
+        frame = min(max(int(round(frame)), self.start), self.end)
+        offset = self._offset + self._stride * (frame - self.start)
+
+        return [
+            cmdx.Matrix4(Matrix.unpack_from(self._map, offset + index))
+            for index in range(0, self._stride, Matrix.size)
+        ]
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+@i__.with_undo_chunk
+def attach(scene, path=None):
+    """Play back the cache of `scene` in place of simulating it
+
+    The cache is read once and keyed onto one animation curve per output
+    of each rigid, connected in place of the rigid. Playback is then an
+    ordinary part of the Maya scene; it is saved along with it and
+    evaluated by Maya like any other animation, including in parallel,
+    in batch and at any time via a DG context. The solver is disabled
+    until the cache is detached.
+
+    Arguments:
+        scene (rdScene): Scene to play back
+        path (str, optional): Cache to read, defaults to next to the scene
+
+    Returns:
+        curves (list): Newly created animation curves
+
+    """
+
+    assert scene.type() == "rdScene", "%s was not a rdScene" % scene
+
+    detach(scene)
+
+    cache = Cache(path or default_path(scene))
+
+    try:
+        return _attach(scene, cache)
+    finally:
+        cache.close()
+
+
+@i__.with_refresh_suspended
+@i__.with_timing
+def _attach(scene, cache):
+    rigids = list(_rigids(cache))
+    indices = {rigid.parent().hex: index for index, rigid in rigids}
+
+    # (rigid, [(attr, [destination plugs])]) of rigids driving anything
+    targets = []
+
+    for index, rigid in rigids:
+        destinations = [
+            (attr, list(rigid[attr].outputs(plugs=True)))
+            for attr in Outputs
+        ]
+
+        # Passive rigids aren't driving anything
+        if any(plugs for _, plugs in destinations):
+            targets += [(index, rigid, destinations)]
+
+    frames = list(range(cache.start, cache.end + 1))
+    matrices = [cache.matrices(frame) for frame in frames]
+    samples = [
+        _local_values(rigid.parent(), index, indices, frames, matrices)
+        for index, rigid, _ in targets
+    ]
+
+    unit = cmdx.om.MTime.uiUnit()
+    times = [cmdx.om.MTime(frame, unit) for frame in frames]
+    curves = []
+
+    with cmdx.DGModifier() as dgmod:
+        for (_, rigid, destinations), values in zip(targets, samples):
+            transform = rigid.parent()
+
+            for (attr, plugs), channel in zip(destinations, values):
+                if not plugs:
+                    continue
+
+                curve = dgmod.create_node(
+                    "animCurveTL" if attr.startswith("outputTranslate")
+                    else "animCurveTA",
+                    name="cacheOf%s_%s" % (transform.name(), attr)
+                )
+
+                dgmod.add_attr(curve, cmdx.Message("cachedRigid"))
+                dgmod.add_attr(curve, cmdx.String("cachedOutput"))
+                curves += [(curve, rigid, attr, plugs, channel)]
+
+        # Remember what is being played back, with the scene
+        dgmod.add_attr(scene, cmdx.String("cachePath"))
+        dgmod.add_attr(scene, cmdx.Boolean("cacheEnabled"))
+        dgmod.add_attr(scene, cmdx.Message("cacheNodes", array=True))
+
+    # Keys aren't added via a modifier, so record them for undo
+    # and redo separately, once their curves have been created
+    change = oma.MAnimCurveChange()
+
+    for curve, _, _, _, values in curves:
+        curve.keys(times, values, interpolation=cmdx.Linear, change=change)
+
+    cmdx.commit(change.undoIt, change.redoIt)
+
+    with cmdx.DGModifier() as dgmod:
+        dgmod.set_attr(scene["cachePath"], cache.path)
+        dgmod.set_attr(scene["cacheEnabled"], scene["enabled"].read())
+        dgmod.set_attr(scene["enabled"], False)
+
+        for index, (curve, rigid, attr, plugs, _) in enumerate(curves):
+            dgmod.set_attr(curve["cachedOutput"], attr)
+            dgmod.connect(rigid["message"], curve["cachedRigid"])
+            dgmod.connect(curve["message"], scene["cacheNodes"][index])
+
+            for plug in plugs:
+                dgmod.connect(curve["output"], plug)
+
+    return [curve for curve, _, _, _, _ in curves]
+
+
+def _local_values(transform, index, indices, frames, matrices):
+    """Return the value of each of `Outputs` per frame, for `transform`
+
+    Arguments:
+        transform (DagNode): Parent of the cached rigid
+        index (int): Index of the rigid in the cache
+        indices (dict): Index of each cached transform, by its hex
+        frames (list): Frame numbers, one per element of `matrices`
+        matrices (list): World matrix of every cached rigid, per frame
+
+    Returns:
+        values (list): Six lists, one per output, of one value per frame
+
+    """
+
+    # Cached matrices include rotate axis and joint orient,
+    # whereas the rotate channels do not
+    pre = transform["rotateAxis"].as_euler().asQuaternion().inverse()
+    post = (
+        transform["jointOrient"].as_euler()
+        if transform.isA(cmdx.kJoint) else cmdx.Euler()
+    ).asQuaternion().inverse()
+
+    order = transform["rotateOrder"].read()
+    parent = transform.parent()
+    parent_index = indices.get(parent.hex) if parent else None
+
+    values = [[] for _ in Outputs]
+
+    for frame, world in zip(frames, matrices):
+        if parent_index is not None:
+            parent_matrix = world[parent_index]
+        else:
+            parent_matrix = transform["parentMatrix"][0].asMatrix(
+                time=cmdx.om.MTime(frame, cmdx.om.MTime.uiUnit())
+            )
+
+        # Remove what translate and rotate aren't responsible for
+        local = cmdx.Tm(world[index] * parent_matrix.inverse())
+        rotation = pre * local.quaternion() * post
+        rotation = rotation.asEulerRotation().reorder(order)
+        translation = local.translation()
+
+        for channel, value in zip(values, (translation.x,
+                                           translation.y,
+                                           translation.z,
+                                           rotation.x,
+                                           rotation.y,
+                                           rotation.z)):
+            channel.append(value)
+
+    # Rotations are keyed, so avoid flips between frames
+    commands._euler_filter(values[3:], order)
+
+    return values
+
+
+def _rigids(cache):
+    """Yield (index, rigid) of each cached rigid still around"""
+    for index, name in enumerate(cache.names):
+        try:
+            rigid = cmdx.encode(name)
+        except cmdx.ExistError:
+            log.warning("%s was cached, but no longer exists" % name)
+            continue
+
+        yield index, rigid
+
+
+def _curves(scene):
+    """Yield the animation curves standing in for the rigids of `scene`"""
+    for element in scene["cacheNodes"]:
+        curve = element.connection(destination=False)
+
+        if curve is not None:
+            yield curve
+
+
+@i__.with_undo_chunk
+def detach(scene):
+    """Resume simulating `scene`, if it was playing back a cache
+
+    Each rigid is reconnected in place of its curves, which are deleted.
+
+    """
+
+    if "cachePath" not in scene:
+        return False
+
+    with cmdx.DGModifier() as dgmod:
+        for curve in _curves(scene):
+            rigid = curve["cachedRigid"].connection(destination=False)
+            attr = curve["cachedOutput"].read()
+
+            for plug in list(curve["output"].outputs(plugs=True)):
+                if rigid is not None:
+                    dgmod.connect(rigid[attr], plug)
+
+            dgmod.delete(curve)
+
+        dgmod.set_attr(scene["enabled"], scene["cacheEnabled"].read())
+
+    with cmdx.DGModifier() as dgmod:
+        dgmod.delete_attr(scene["cachePath"])
+        dgmod.delete_attr(scene["cacheEnabled"])
+        dgmod.delete_attr(scene["cacheNodes"])
+
+    return True
@@ -14,7 +14,7 @@ import sys
 import logging
 import functools
 
-from maya import cmds
+from maya import cmds, mel
 from maya.api import OpenMayaAnim as oma
 from .vendor import cmdx
 from . import (
@@ -93,31 +93,40 @@ def create_rigid(node, scene, opts=None, _cache=None):
             based on shape volume
         existing (int): What to do about existing connections to translate
             and rotate channels.
+        lean (bool): Connect active rigids directly to their transform,
+            without the helper nodes needed for blending with animation.
+            Ignored for transforms that are already animated.
         defaults (dict, optional): Default attribute values for the
             newly created rigid
-        _cache (AttributeCache, optional): Reach for attributes here first,
+        _cache (Snapshot, optional): Reach for attributes here first,
             to avoid triggering evaluations prematurely
 
     """
 
+    return create_rigids([node], scene, opts=opts, _cache=_cache)[0]
+
+
+def rigid_target(node):
+    """Return the transform and shape a rigid for `node` would be made from
+
+    Raises an AssertionError if `node` cannot be made into a rigid.
+
+    Arguments:
+        node (DagNode): Maya transform or shape
+
+    Returns:
+        transform, shape (tuple): Where shape may be None
+
+    """
+
     if isinstance(node, i__.string_types):
         node = cmdx.encode(node)
 
-    if isinstance(scene, i__.string_types):
-        scene = cmdx.encode(scene)
-
     assert isinstance(node, cmdx.DagNode), type(node)
-    assert isinstance(scene, cmdx.DagNode), type(scene)
-    assert scene.type() == "rdScene", scene.type()
-
     assert not node.shape(type="rdRigid"), (
         "%s is already a rigid" % node
     )
 
-    opts = opts or {}
-    cache = _cache or {}
-    defaults = opts.get("defaults", {})
-
     if node.isA(cmdx.kShape):
         transform = node.parent()
         shape = node
@@ -131,71 +140,148 @@ def create_rigid(node, scene, opts=None, _cache=None):
         "%s already had a rigid" % transform
     )
 
-    rest = cache.get((node, "worldMatrix"))
-    rest = rest or transform["worldMatrix"][0].asMatrix()
+    return transform, shape
 
-    with cmdx.DagModifier() as mod:
-        rigid = _rdrigid(mod, "rRigid", parent=transform)
 
-        # Copy current transformation
-        mod.set_attr(rigid["cachedRestMatrix"], rest)
-        mod.set_attr(rigid["inputMatrix"], rest)
+@i__.with_undo_chunk
+@i__.with_unique_names
+def create_rigids(nodes, scene, opts=None, _cache=None):
+    """Create a new rigid for each of `nodes`
 
-        # Add to scene
-        _add_rigid(mod, rigid, scene)
+    Like :func:`create_rigid`, but for many nodes at once. Every world
+    matrix is read up-front, rigids are created and added to `scene`
+    in one modifier and user attributes are added in one pass, which
+    makes this considerably faster for anything more than a handful.
+
+    Arguments:
+        nodes (list): Maya transforms or shapes
+        scene (DagNode): Ragdoll scene to which the new rigids are added
+        opts (dict, optional): Same as for :func:`create_rigid`
+        _cache (Snapshot, optional): Reach for attributes here first,
+            to avoid triggering evaluations prematurely
+
+    Returns:
+        rigids (list): One rdRigid per node, in the order given
+
+    """
+
+    if isinstance(scene, i__.string_types):
+        scene = cmdx.encode(scene)
+
+    assert isinstance(scene, cmdx.DagNode), type(scene)
+    assert scene.type() == "rdScene", scene.type()
+
+    opts = opts or {}
+    cache = _cache if _cache is not None else i__.Snapshot()
+    defaults = opts.get("defaults", {})
+
+    # Validate everything before anything is created,
+    # so that a bad node doesn't leave half a ragdoll behind
+    targets = []
+    seen = set()
+    for node in nodes:
+        transform, shape = rigid_target(node)
+
+        assert transform.hex not in seen, (
+            "%s was given more than once" % transform
+        )
+        seen.add(transform.hex)
+
+        rest = cache[(transform, "worldMatrix")]
+
+        targets += [(rest, transform, shape)]
+
+    # Joints without a shape are interpreted via their geometry,
+    # read from the scene before any rigid is around to evaluate
+    joints = [
+        transform for _, transform, shape in targets
+        if not shape and transform.isA(cmdx.kJoint)
+    ]
+
+    geometries = dict(zip(
+        (joint.hex for joint in joints),
+        infer_geometries(joints, _cache=cache)
+    ))
+
+    rigids = []
 
-    # Transfer geometry into rigid, if any
-    #
-    #     ______                ______
-    #    /\    /|              /     /|
-    #   /  \  /.|   ------>   /     / |
-    #  /____\/  |            /____ /  |
-    #  |\   | . |            |    |   |
-    #  | \  |  /             |    |  /
-    #  |  \ |./              |    | /
-    #  |___\|/               |____|/
-    #
-    #
     with cmdx.DagModifier() as mod:
-        if shape:
-            _interpret_shape(mod, rigid, shape)
-        else:
-            _interpret_transform(mod, rigid, transform)
+        for rest, transform, _ in targets:
+            rigid = _rdrigid(mod, "rRigid", parent=transform)
 
-        if opts.get("computeMass"):
-            # Establish a sensible default mass, also taking into
-            # consideration that joints must be comparable to meshes.
-            # Mass unit is kg, whereas lengths are in centimeters
-            mod.set_attr(rigid["mass"], (
-                rigid["extentsX"].read() *
-                rigid["extentsY"].read() *
-                rigid["extentsZ"].read() *
-                0.01
-            ))
+            # Copy current transformation
+            mod.set_attr(rigid["cachedRestMatrix"], rest)
+            mod.set_attr(rigid["inputMatrix"], rest)
 
-    uas = i__.UserAttributes(rigid, transform)
-    uas.add_divider("Ragdoll")
-    uas.add("kinematic")
-    uas.add("collide")
-    uas.add("mass")
-    uas.add("friction")
-    uas.add("restitution")
-    uas.do_it()
+            # Add to scene
+            _add_rigid(mod, rigid, scene)
+
+            rigids += [rigid]
+
+        # Transfer geometry into rigid, if any
+        #
+        #     ______                ______
+        #    /\    /|              /     /|
+        #   /  \  /.|   ------>   /     / |
+        #  /____\/  |            /____ /  |
+        #  |\   | . |            |    |   |
+        #  | \  |  /             |    |  /
+        #  |  \ |./              |    | /
+        #  |___\|/               |____|/
+        #
+        #
+        for rigid, (_, transform, shape) in zip(rigids, targets):
+            if shape:
+                _interpret_shape(mod, rigid, shape)
+            else:
+                _interpret_transform(mod, rigid, transform,
+                                     geometry=geometries.get(transform.hex))
+
+        if opts.get("computeMass"):
+            for rigid in rigids:
+                # Establish a sensible default mass, also taking into
+                # consideration that joints must be comparable to meshes.
+                # Mass unit is kg, whereas lengths are in centimeters
+                mod.set_attr(rigid["mass"], (
+                    rigid["extentsX"].read() *
+                    rigid["extentsY"].read() *
+                    rigid["extentsZ"].read() *
+                    0.01
+                ))
+
+    user_attributes = []
+    for rigid, (_, transform, _) in zip(rigids, targets):
+        uas = i__.UserAttributes(rigid, transform)
+        uas.add_divider("Ragdoll")
+        uas.add("kinematic")
+        uas.add("collide")
+        uas.add("mass")
+        uas.add("friction")
+        uas.add("restitution")
+        user_attributes += [uas]
+
+    i__.UserAttributes.do_many(user_attributes)
 
     # Make the connections
     with cmdx.DagModifier() as mod:
-        if opts.get("passive"):
-            _connect_passive(mod, rigid, transform)
-        else:
-            _remove_pivots(mod, transform)
-            _connect_active(mod, rigid, transform,
-                            existing=opts.get("existing"))
+        for rigid, (_, transform, _) in zip(rigids, targets):
+            if opts.get("passive"):
+                _connect_passive(mod, rigid, transform)
 
-        # Apply provided default attribute values
-        for key, value in defaults.items():
-            mod.set_attr(rigid[key], value)
+            elif opts.get("lean") and not _is_animated(transform):
+                _remove_pivots(mod, transform)
+                _connect_active_lean(mod, rigid, transform)
 
-    return rigid
+            else:
+                _remove_pivots(mod, transform)
+                _connect_active(mod, rigid, transform,
+                                existing=opts.get("existing"))
+
+            # Apply provided default attribute values
+            for key, value in defaults.items():
+                mod.set_attr(rigid[key], value)
+
+    return rigids
 
 
 def create_active_rigid(node, scene, **kwargs):
@@ -408,15 +494,7 @@ def convert_to_point(con, opts=None):
 
         node = con.parent() if opts["standalone"] else con
         mod.rename(node, i__.unique_name("rPointConstraint"))
-        mod.set_attr(con["type"], c.PointConstraint)
-        mod.set_attr(con["limitEnabled"], True)
-        mod.set_attr(con["limitStrength"], 1)
-        mod.set_attr(con["linearLimitX"], -1)
-        mod.set_attr(con["linearLimitY"], -1)
-        mod.set_attr(con["linearLimitZ"], -1)
-        mod.set_attr(con["angularLimitX"], 0)
-        mod.set_attr(con["angularLimitY"], 0)
-        mod.set_attr(con["angularLimitZ"], 0)
+        _set_constraint_type(mod, con, c.PointConstraint)
 
     return con
 
@@ -442,15 +520,7 @@ def convert_to_orient(con, opts=None):
 
         node = con.parent() if opts["standalone"] else con
         mod.rename(node, i__.unique_name("rOrientConstraint"))
-        mod.set_attr(con["type"], c.OrientConstraint)
-        mod.set_attr(con["limitEnabled"], True)
-        mod.set_attr(con["limitStrength"], 1)
-        mod.set_attr(con["linearLimitX"], 0)
-        mod.set_attr(con["linearLimitY"], 0)
-        mod.set_attr(con["linearLimitZ"], 0)
-        mod.set_attr(con["angularLimitX"], cmdx.radians(-1))
-        mod.set_attr(con["angularLimitY"], cmdx.radians(-1))
-        mod.set_attr(con["angularLimitZ"], cmdx.radians(-1))
+        _set_constraint_type(mod, con, c.OrientConstraint)
 
     return con
 
@@ -486,15 +556,7 @@ def convert_to_hinge(con, opts=None):
 
         node = con.parent() if opts["standalone"] else con
         mod.rename(node, i__.unique_name("rHingeConstraint"))
-        mod.set_attr(con["type"], c.HingeConstraint)
-        mod.set_attr(con["limitEnabled"], True)
-        mod.set_attr(con["limitStrength"], 1)
-        mod.set_attr(con["linearLimitX"], -1)
-        mod.set_attr(con["linearLimitY"], -1)
-        mod.set_attr(con["linearLimitZ"], -1)
-        mod.set_attr(con["angularLimitX"], cmdx.radians(45))
-        mod.set_attr(con["angularLimitY"], cmdx.radians(-1))
-        mod.set_attr(con["angularLimitZ"], cmdx.radians(-1))
+        _set_constraint_type(mod, con, c.HingeConstraint)
 
     reorient(con)
 
@@ -522,19 +584,7 @@ def convert_to_socket(con, opts=None):
 
         node = con.parent() if opts["standalone"] else con
         mod.rename(node, i__.unique_name("rSocketConstraint"))
-        mod.set_attr(con["type"], c.SocketConstraint)
-        mod.set_attr(con["limitEnabled"], True)
-        mod.set_attr(con["limitStrength"], 1)
-        mod.set_attr(con["driveEnabled"], True)
-        mod.set_attr(con["driveStrength"], 1)
-        mod.set_attr(con["linearDriveStiffness"], 0)
-        mod.set_attr(con["linearDriveDamping"], 0)
-        mod.set_attr(con["linearLimitX"], -1)
-        mod.set_attr(con["linearLimitY"], -1)
-        mod.set_attr(con["linearLimitZ"], -1)
-        mod.set_attr(con["angularLimitX"], cmdx.radians(45))
-        mod.set_attr(con["angularLimitY"], cmdx.radians(45))
-        mod.set_attr(con["angularLimitZ"], cmdx.radians(45))
+        _set_constraint_type(mod, con, c.SocketConstraint)
 
     return con
 
@@ -562,15 +612,7 @@ def convert_to_parent(con, opts=None):
 
         node = con.parent() if opts["standalone"] else con
         mod.rename(node, i__.unique_name("rParentConstraint"))
-        mod.set_attr(con["type"], c.ParentConstraint)
-        mod.set_attr(con["limitEnabled"], True)
-        mod.set_attr(con["limitStrength"], 1)
-        mod.set_attr(con["linearLimitX"], -1)
-        mod.set_attr(con["linearLimitY"], -1)
-        mod.set_attr(con["linearLimitZ"], -1)
-        mod.set_attr(con["angularLimitX"], cmdx.radians(-1))
-        mod.set_attr(con["angularLimitY"], cmdx.radians(-1))
-        mod.set_attr(con["angularLimitZ"], cmdx.radians(-1))
+        _set_constraint_type(mod, con, c.ParentConstraint)
 
     return con
 
@@ -580,7 +622,7 @@ def convert_to_parent(con, opts=None):
                    kwargs={"aim": (cmdx.Vector, None),
                            "opts": (dict, None)},
                    returns=None)
-def orient(con, aim=None, up=None):
+def orient(con, aim=None, up=None, _cache=None):
     """Orient a constraint
 
     Aim the constraint towards the child of its rigid, unless an `aim`
@@ -589,8 +631,13 @@ def orient(con, aim=None, up=None):
     determines hierarchy rather than Maya's physical hierarchy, the
     `aim` is mandatory.
 
+    Arguments:
+        _cache (Snapshot, optional): Reach for transforms here first
+
     """
 
+    cache = _cache if _cache is not None else i__.Snapshot()
+
     if isinstance(con, i__.string_types):
         con = cmdx.encode(con)
 
@@ -611,10 +658,10 @@ def orient(con, aim=None, up=None):
     # Rather than ask the node for where it is, which could
     # trigger an evaluation, we fetch an input matrix that
     # isn't computed by Ragdoll
-    child_matrix = child_rigid["cachedRestMatrix"].asMatrix()
-    parent_matrix = parent_rigid["cachedRestMatrix"].asMatrix()
+    child_matrix = cache[(child_rigid, "cachedRestMatrix")]
+    parent_matrix = cache[(parent_rigid, "cachedRestMatrix")]
 
-    child_tm = child_rigid.transform(cmdx.sWorld)
+    child_tm = cache.transform(child_rigid.parent())
 
     # Try and aim towards the first child of the same type in the
     # hierarchy of the constraint. This assumes constraints are
@@ -636,7 +683,7 @@ def orient(con, aim=None, up=None):
             aim.translateBy(cmdx.Vector(1, 0, 0), cmdx.sPreTransform)
             aim = aim.translation()
         else:
-            aim = child.transform(cmdx.sWorld).translation()
+            aim = cache.transform(child).translation()
 
     # The up direction should typically be the parent rigid, but
     # can be overridden too.
@@ -647,7 +694,7 @@ def orient(con, aim=None, up=None):
     #    o---------o
     #
     if up is None:
-        up = parent_rigid.transform(cmdx.sWorld).translation()
+        up = cache.transform(parent_rigid.parent()).translation()
 
     def orient_from_positions(a, b, c=None):
         """Look at `a` from `b`, with an optional up-vector `c`
@@ -744,13 +791,266 @@ def reorient(con):
             mod.set_attr(con["childFrame"], child_frame)
 
 
+@i__.with_undo_chunk
+def orient_many(constraints, aims=None, ups=None, _cache=None):
+    """Orient many constraints at once
+
+    Same as calling :func:`orient` on each constraint, except every
+    position and rest matrix is read up-front and all frames are
+    computed together, with one modifier for the result.
+
+    Arguments:
+        constraints (list): rdConstraint nodes to orient
+        aims (list, optional): One aim position or None per constraint
+        ups (list, optional): One up position or None per constraint
+        _cache (Snapshot, optional): Reach for transforms here first
+
+    """
+
+    aims = aims or [None] * len(constraints)
+    ups = ups or [None] * len(constraints)
+
+    assert len(aims) == len(constraints), "Must provide one aim per constraint"
+    assert len(ups) == len(constraints), "Must provide one up per constraint"
+
+    oriented = []
+    pairs = []
+    oriented_aims = []
+    oriented_ups = []
+
+    for con, aim, up in zip(constraints, aims, ups):
+        assert con.type() == "rdConstraint", (
+            "%s was not a rdConstraint" % con
+        )
+
+        parent_rigid = con["parentRigid"].connection(type="rdRigid")
+        child_rigid = con["childRigid"].connection(type="rdRigid")
+
+        if not (parent_rigid and child_rigid):
+            continue
+
+        oriented += [con]
+        pairs += [(parent_rigid, child_rigid)]
+        oriented_aims += [aim]
+        oriented_ups += [up]
+
+    if not oriented:
+        return
+
+    parent_frames, child_frames = _orient_frames(
+        pairs, oriented_aims, oriented_ups, _cache
+    )
+
+    with cmdx.DagModifier() as mod:
+        for con, parent_frame, child_frame in zip(oriented,
+                                                  parent_frames,
+                                                  child_frames):
+            mod.set_attr(con["parentFrame"], cmdx.Mat4(parent_frame))
+            mod.set_attr(con["childFrame"], cmdx.Mat4(child_frame))
+
+
+def _orient_frames(pairs, aims, ups, _cache=None):
+    """Compute parent and child frames for (parent, child) rigid `pairs`
+
+    This is the math behind :func:`orient`, for many pairs at once.
+
+    Returns:
+        (parent_frames, child_frames): Flat 16-element matrices
+
+    """
+
+    cache = _cache if _cache is not None else i__.Snapshot()
+
+    def world_position(node):
+        return tuple(cache[(node, "worldMatrix")])[12:15]
+
+    origins = []
+    aim_positions = []
+    up_positions = []
+    parent_matrices = []
+    child_matrices = []
+
+    for (parent_rigid, child_rigid), aim, up in zip(pairs, aims, ups):
+        origin = world_position(child_rigid.parent())
+
+        if aim is None:
+            transform = child_rigid.parent()
+            child = transform.descendent(type=transform.type())
+
+            if not child:
+                aim = cache.transform(child_rigid.parent())
+                aim.translateBy(cmdx.Vector(1, 0, 0), cmdx.sPreTransform)
+                aim = aim.translation()
+            else:
+                aim = world_position(child)
+
+        if up is None:
+            up = world_position(parent_rigid.parent())
+
+        origins += [origin]
+        aim_positions += [tuple(aim)]
+        up_positions += [tuple(up)]
+        parent_matrices += [tuple(cache[(parent_rigid, "cachedRestMatrix")])]
+        child_matrices += [tuple(cache[(child_rigid, "cachedRestMatrix")])]
+
+    frames = cmdx.aim_matrices(origins, aim_positions, up_positions)
+    parent_frames = cmdx.multiply_matrices(
+        frames, cmdx.inverse_matrices(parent_matrices)
+    )
+    child_frames = cmdx.multiply_matrices(
+        frames, cmdx.inverse_matrices(child_matrices)
+    )
+
+    return parent_frames, child_frames
+
+
+@i__.with_undo_chunk
+@i__.with_unique_names
+def create_constraints(pairs, type=c.SocketConstraint, orient=True,
+                       aims=None, ups=None, _cache=None):
+    """Create a constraint of `type` between each (parent, child) pair
+
+    Like calling e.g. :func:`socket_constraint` followed by :func:`orient`
+    per pair, except rest matrices and positions are read once up-front,
+    every frame is computed together and one modifier makes it so.
+
+    Arguments:
+        pairs (list): Of (parent, child) tuples, where parent is an
+            rdRigid or rdScene and child an rdRigid
+        type (int, optional): One of the constraint types, e.g.
+            SocketConstraint or HingeConstraint
+        orient (bool, optional): Aim each constraint towards the next
+            child in the hierarchy, as :func:`orient` does, otherwise
+            maintain current offset
+        aims (list, optional): Worldspace position to aim each
+            constraint towards, like `aim` of :func:`orient`
+        ups (list, optional): Worldspace up position per constraint,
+            like `up` of :func:`orient`
+        _cache (Snapshot, optional): Reach for transforms here first
+
+    Returns:
+        constraints (list): One rdConstraint per pair, in the order given
+
+    """
+
+    names = {
+        c.PointConstraint: "rPointConstraint",
+        c.OrientConstraint: "rOrientConstraint",
+        c.HingeConstraint: "rHingeConstraint",
+        c.SocketConstraint: "rSocketConstraint",
+        c.ParentConstraint: "rParentConstraint",
+    }
+
+    assert type in names, "%s was not a constraint type" % type
+
+    cache = _cache if _cache is not None else i__.Snapshot()
+    aims = aims or [None] * len(pairs)
+    ups = ups or [None] * len(pairs)
+    scenes = []
+    rigid_pairs = []
+    rigid_aims = []
+    rigid_ups = []
+
+    assert len(aims) == len(ups) == len(pairs), (
+        "Expected one aim and up per pair"
+    )
+
+    for (parent, child), aim, up in zip(pairs, aims, ups):
+        assert child.type() == "rdRigid", child.type()
+        assert parent.type() in ("rdRigid", "rdScene"), (
+            "%s must be a rigid or scene" % parent.type()
+        )
+
+        if parent.type() == "rdScene":
+            scene = parent
+        else:
+            scene = parent["nextState"].connection()
+            assert scene and scene.type() == "rdScene", (
+                "%s was not part of a scene" % parent
+            )
+
+            rigid_pairs += [(parent, child)]
+            rigid_aims += [aim]
+            rigid_ups += [up]
+
+        assert child["nextState"].connection() == scene, (
+            "%s and %s was not part of the same scene" % (parent, child)
+        )
+
+        scenes += [scene]
+
+    # Everything is read before anything is written, so as
+    # to avoid evaluating partially constructed constraints
+    parent_matrices = [tuple(cache[(parent, "cachedRestMatrix")])
+                       for parent, _ in rigid_pairs]
+    child_matrices = [tuple(cache[(child, "cachedRestMatrix")])
+                      for _, child in rigid_pairs]
+
+    # Maintain offset, like _reset_constraint
+    offsets = cmdx.multiply_matrices(
+        child_matrices, cmdx.inverse_matrices(parent_matrices)
+    )
+
+    if orient and rigid_pairs:
+        parent_frames, child_frames = _orient_frames(
+            rigid_pairs, rigid_aims, rigid_ups, cache
+        )
+
+    else:
+        parent_frames = offsets
+        child_frames = [tuple(cmdx.Mat4())] * len(rigid_pairs)
+
+        if type == c.HingeConstraint:
+            # Same as reorient(), twist along X and bend along Z
+            rotation = cmdx.Quat(cmdx.radians(-90), cmdx.Vector(0, 0, 1))
+            rotation *= cmdx.Quat(cmdx.radians(90), cmdx.Vector(1, 0, 0))
+            rotation = [tuple(cmdx.Tm(rotate=rotation).asMatrix())]
+            rotation *= len(rigid_pairs)
+
+            parent_frames = cmdx.multiply_matrices(rotation, parent_frames)
+            child_frames = cmdx.multiply_matrices(rotation, child_frames)
+
+    frames = iter(zip(offsets, parent_frames, child_frames))
+
+    draw_scales = [_scale_from_rigid(child) for _, child in pairs]
+
+    constraints = []
+
+    with cmdx.DagModifier() as mod:
+        for (parent, child), scene, draw_scale in zip(pairs,
+                                                      scenes,
+                                                      draw_scales):
+            con = _rdconstraint(mod, names[type], parent=child.parent())
+
+            mod.set_attr(con["drawScale"], draw_scale)
+            mod.connect(parent["ragdollId"], con["parentRigid"])
+            mod.connect(child["ragdollId"], con["childRigid"])
+
+            _set_constraint_type(mod, con, type)
+
+            if parent.type() == "rdRigid":
+                offset, parent_frame, child_frame = next(frames)
+
+                # Drive to where you currently are
+                mod.set_attr(con["driveMatrix"], cmdx.Mat4(offset))
+                mod.set_attr(con["parentFrame"], cmdx.Mat4(parent_frame))
+                mod.set_attr(con["childFrame"], cmdx.Mat4(child_frame))
+
+            # Add to scene
+            _add_constraint(mod, con, scene)
+
+            constraints += [con]
+
+    return constraints
+
+
 @i__.with_undo_chunk
 @i__.with_contract(args=(cmdx.DagNode,),
                    kwargs={"reference": (cmdx.DagNode, None)},
                    returns=(cmdx.DagNode,
                             cmdx.DagNode,
                             cmdx.DagNode))
-def create_absolute_control(rigid, reference=None):
+def create_absolute_control(rigid, reference=None, _cache=None):
     """Control a rigid body in worldspace
 
     Given a worldmatrix, attempt to guide a rigid body to match,
@@ -759,12 +1059,16 @@ def create_absolute_control(rigid, reference=None):
     This can be handy for transforming a rigid body as though it was
     kinematic, except with some response to forces and contacts.
 
+    Arguments:
+        _cache (Snapshot, optional): Reach for transforms here first
+
     """
 
     if isinstance(rigid, i__.string_types):
         rigid = cmdx.encode(rigid)
 
-    tmat = rigid.transform(cmdx.sWorld)
+    cache = _cache if _cache is not None else i__.Snapshot()
+    tmat = cache.transform(rigid.parent())
 
     scene = rigid["nextState"].connection()
     assert scene and scene.type() == "rdScene", (
@@ -843,26 +1147,57 @@ def create_active_control(reference, rigid):
     if isinstance(rigid, i__.string_types):
         rigid = cmdx.encode(rigid)
 
-    assert reference.isA(cmdx.kTransform), "%s was not a transform" % reference
-    assert rigid.type() == "rdRigid", "%s was not a rdRigid" % rigid
+    return create_active_controls([(reference, rigid)])[0]
 
-    scene = rigid["nextState"].connection()
-    assert scene and scene.type() == "rdScene", (
-        "%s was not part of a scene" % rigid
-    )
 
-    con = rigid.sibling(type="rdConstraint")
-    assert con is not None, "Need an existing constraint"
+@i__.with_undo_chunk
+@i__.with_unique_names
+def create_active_controls(pairs):
+    """Control many rigid bodies, each using a reference transform
+
+    Like calling :func:`create_active_control` per pair, except every
+    control is created with one modifier.
+
+    Arguments:
+        pairs (list): Of (reference, rigid) tuples
+
+    Returns:
+        controls (list): One rdControl per pair, in the order given
+
+    """
+
+    constraints = []
+
+    for reference, rigid in pairs:
+        assert reference.isA(cmdx.kTransform), (
+            "%s was not a transform" % reference
+        )
+        assert rigid.type() == "rdRigid", "%s was not a rdRigid" % rigid
+
+        scene = rigid["nextState"].connection()
+        assert scene and scene.type() == "rdScene", (
+            "%s was not part of a scene" % rigid
+        )
+
+        con = rigid.sibling(type="rdConstraint")
+        assert con is not None, "Need an existing constraint"
+
+        constraints += [con]
+
+    controls = []
 
     with cmdx.DagModifier() as mod:
-        ctrl = _rdcontrol(mod, "rActiveControl1", reference)
-        mod.connect(rigid["ragdollId"], ctrl["rigid"])
-        mod.connect(reference["matrix"], con["driveMatrix"])
+        for (reference, rigid), con in zip(pairs, constraints):
+            ctrl = _rdcontrol(mod, "rActiveControl1", reference)
+            mod.connect(rigid["ragdollId"], ctrl["rigid"])
+            mod.connect(reference["matrix"], con["driveMatrix"])
 
-        mod.set_attr(con["driveEnabled"], True)
-        mod.set_attr(con["driveStrength"], 1.0)
-        mod.set_attr(con["angularDriveStiffness"], 10000.0)
-        mod.set_attr(con["angularDriveDamping"], 1000.0)
+            mod.set_attr(con["driveEnabled"], True)
+            mod.set_attr(con["driveStrength"], 1.0)
+            mod.set_attr(con["angularDriveStiffness"], 10000.0)
+            mod.set_attr(con["angularDriveDamping"], 1000.0)
+
+            controls += [ctrl]
 
     forwarded = (
         "driveStrength",
@@ -872,16 +1207,21 @@ def create_active_control(reference, rigid):
         "angularDriveDamping"
     )
 
-    reference_proxies = i__.UserAttributes(con, reference)
-    reference_proxies.add_divider("Ragdoll")
+    user_attributes = []
 
-    for attr in forwarded:
-        # Expose on constraint node itself
-        reference_proxies.add(attr)
+    for (reference, _), con in zip(pairs, constraints):
+        reference_proxies = i__.UserAttributes(con, reference)
+        reference_proxies.add_divider("Ragdoll")
 
-    reference_proxies.do_it()
+        for attr in forwarded:
+            # Expose on constraint node itself
+            reference_proxies.add(attr)
+
+        user_attributes += [reference_proxies]
 
-    return ctrl
+    i__.UserAttributes.do_many(user_attributes)
+
+    return controls
 
 
 @i__.with_undo_chunk
@@ -939,8 +1279,15 @@ create_passive_control = create_kinematic_control
 
 
 @i__.with_undo_chunk
-def set_initial_state(rigids):
-    """Use current world transformation as initial state for `rigids"""
+def set_initial_state(rigids, frame=None):
+    """Use current world transformation as initial state for `rigids`
+
+    Arguments:
+        rigids (list): rdRigid nodes
+        frame (int, optional): Use the transformation at this frame
+            instead, without changing the current time
+
+    """
 
     assert isinstance(rigids, (tuple, list)), "%s was not a list" % rigids
 
@@ -952,19 +1299,249 @@ def set_initial_state(rigids):
         "%s wasn't all rdRigid nodes" % str(rigids)
     )
 
+    _set_initial_state(rigids, frame)
+
+
+@i__.with_undo_chunk
+def set_scene_initial_state(scene, frame=None):
+    """Use current world transformation as initial state for all of `scene`
+
+    Arguments:
+        scene (rdScene): Every rigid of this scene
+        frame (int, optional): Use the transformation at this frame
+            instead, without changing the current time
+
+    Returns:
+        rigids (list): Rigids whose initial state was set
+
+    """
+
+    if isinstance(scene, i__.string_types):
+        scene = cmdx.encode(scene)
+
+    assert scene.type() == "rdScene", "%s was not a rdScene" % scene
+
+    rigids = i__.node_index.members(scene, "rdRigid")
+
+    _set_initial_state(rigids, frame)
+
+    return rigids
+
+
+def _set_initial_state(rigids, frame=None):
     # Fetch matrices separately from modifying them, since they may
     # cause a re-evaluation that affect each other. Bad!
-    rest_matrices = []
-    for rigid in rigids:
-        rest_matrices += [rigid.parent()["worldMatrix"][0].asMatrix()]
+    transforms = [rigid.parent() for rigid in rigids]
+    snapshot = i__.Snapshot()
+
+    if frame is None:
+        snapshot.capture(transforms, ("worldMatrix",))
+
+    else:
+        with cmdx.DGContext(frame, cmdx.TimeUiUnit()):
+            snapshot.capture(transforms, ("worldMatrix",))
 
     with cmdx.DagModifier() as mod:
-        for rigid, rest in zip(rigids, rest_matrices):
+        for rigid, transform in zip(rigids, transforms):
+            rest = snapshot[(transform, "worldMatrix")]
+
             if rigid["inputMatrix"].editable:
                 mod.set_attr(rigid["inputMatrix"], rest)
             mod.set_attr(rigid["cachedRestMatrix"], rest)
 
 
+@i__.with_undo_chunk
+@i__.with_refresh_suspended
+@i__.with_timing
+def bake(rigids, start=None, end=None, euler_filter=True, tolerance=None):
+    """Bake the simulation of `rigids` onto their transforms
+
+    The simulation is stepped once from `start` to `end`, sampling the
+    outputs of every rigid per frame, after which one animation curve
+    per channel is created and keyed in bulk. Curves replace whatever
+    was previously connected to translate and rotate.
+
+    Arguments:
+        rigids (list): rdRigid nodes to bake
+        start (int, optional): First frame, defaults to start of playback
+        end (int, optional): Last frame, defaults to end of playback
+        euler_filter (bool, optional): Avoid flips in rotation between
+            consecutive frames
+        tolerance (float, optional): Remove keys that differ less than
+            this from a straight line between their neighbours
+
+    Returns:
+        curves (list): Newly created animation curves
+
+    """
+
+    assert isinstance(rigids, (tuple, list)), "%s was not a list" % rigids
+
+    rigids = [
+        cmdx.encode(rigid) if isinstance(rigid, i__.string_types) else rigid
+        for rigid in rigids
+    ]
+
+    assert all(r.type() == "rdRigid" for r in rigids), (
+        "%s wasn't all rdRigid nodes" % str(rigids)
+    )
+
+    if start is None:
+        start = oma.MAnimControl.minTime().value
+
+    if end is None:
+        end = oma.MAnimControl.maxTime().value
+
+    frames = list(range(int(start), int(end) + 1))
+    channels = ("translateX", "translateY", "translateZ",
+                "rotateX", "rotateY", "rotateZ")
+
+    # Gather plugs once, as opposed to once per frame
+    plugs = [
+        [rigid["output" + channel[0].upper() + channel[1:]]
+         for channel in channels]
+        for rigid in rigids
+    ]
+
+    samples = [[[] for _ in channels] for _ in rigids]
+    initial_time = cmds.currentTime(query=True)
+
+    try:
+        for frame in frames:
+            cmds.currentTime(frame, update=True)
+
+            for rigid_plugs, rigid_samples in zip(plugs, samples):
+                for plug, values in zip(rigid_plugs, rigid_samples):
+                    values.append(plug.read())
+
+    finally:
+        cmds.currentTime(initial_time, update=True)
+
+    if euler_filter:
+        for rigid, rigid_samples in zip(rigids, samples):
+            order = rigid.parent()["rotateOrder"].read()
+            _euler_filter(rigid_samples[3:], order)
+
+    unit = cmdx.om.MTime.uiUnit()
+    times = [cmdx.om.MTime(frame, unit) for frame in frames]
+    curves = []
+
+    with cmdx.DGModifier() as dgmod:
+        for rigid, rigid_samples in zip(rigids, samples):
+            transform = rigid.parent()
+
+            for channel, values in zip(channels, rigid_samples):
+                if transform[channel].locked:
+                    continue
+
+                keys = times
+
+                if tolerance is not None:
+                    keys, values = _reduce_keys(times, values, tolerance)
+
+                curve = dgmod.create_node(
+                    "animCurveTL" if channel.startswith("translate")
+                    else "animCurveTA",
+                    name="%s_%s" % (transform.name(), channel)
+                )
+
+                curves += [(curve, transform[channel], keys, values)]
+
+    # Keys aren't added via a modifier, so record them for undo
+    # and redo separately, once their curves have been created
+    change = oma.MAnimCurveChange()
+
+    # Linear, such that reduced keys stay within tolerance
+    for curve, _, keys, values in curves:
+        curve.keys(keys, values, interpolation=cmdx.Linear, change=change)
+
+    cmdx.commit(change.undoIt, change.redoIt)
+
+    with cmdx.DagModifier() as mod:
+        for curve, plug, _, _ in curves:
+            mod.connect(curve["output"], plug)
+
+    return [curve for curve, _, _, _ in curves]
+
+
+def _euler_filter(rotations, order=0):
+    """Avoid flips between consecutive rotations, in-place
+
+    Arguments:
+        rotations (list): Three lists, of X, Y and Z values in radians
+        order (int, optional): Rotate order, e.g. 0 for XYZ
+
+    """
+
+    previous = None
+
+    for index, rotation in enumerate(zip(*rotations)):
+        euler = cmdx.om.MEulerRotation(rotation[0],
+                                       rotation[1],
+                                       rotation[2],
+                                       order)
+
+        if previous is not None:
+            euler = euler.closestSolution(previous)
+
+        rotations[0][index] = euler.x
+        rotations[1][index] = euler.y
+        rotations[2][index] = euler.z
+
+        previous = euler
+
+
+def _reduce_keys(times, values, tolerance):
+    """Remove keys that lie on a line between their neighbours
+
+    Keys are reduced via Douglas-Peucker, such that every key removed
+    is within `tolerance` of the line between the keys that end up
+    surrounding it, once reduction is done.
+
+    Arguments:
+        times (list): MTime per key
+        values (list): Value per key
+        tolerance (float): How far off a line a key may be and
+            still be removed
+
+    """
+
+    if len(values) < 3:
+        return times, values
+
+    kept = {0, len(values) - 1}
+    segments = [(0, len(values) - 1)]
+
+    while segments:
+        first, last = segments.pop()
+        t0 = times[first].value
+        t1 = times[last].value
+
+        furthest = None
+        distance = tolerance
+
+        for index in range(first + 1, last):
+
+            # Where the line between the two ends is, at this time
+            blend = (times[index].value - t0) / (t1 - t0)
+            expected = values[first] + (values[last] -
+                                        values[first]) * blend
+
+            if abs(values[index] - expected) > distance:
+                furthest = index
+                distance = abs(values[index] - expected)
+
+        # Keep the key furthest from the line, and look again
+        # at each side of it
+        if furthest is not None:
+            kept.add(furthest)
+            segments += [(first, furthest), (furthest, last)]
+
+    kept = sorted(kept)
+
+    return [times[i] for i in kept], [values[i] for i in kept]
+
+
 @i__.with_undo_chunk
 def transfer_attributes(a, b, opts=None):
     if isinstance(a, i__.string_types):
@@ -994,6 +1571,77 @@ def transfer_attributes(a, b, opts=None):
         transfer_constraint(ca, cb, opts=opts)
 
 
+@i__.with_undo_chunk
+def transfer_rig(rule=("_L_", "_R_"), nodes=None, opts=None):
+    """Transfer attributes from one side of a rig to the other
+
+    Counterparts are found by replacing the first half of `rule` with the
+    second half in the full path of each rigid and constraint, and every
+    pair is transferred in a single modifier.
+
+    Arguments:
+        rule (tuple, optional): Source and destination name fragments
+        nodes (list, optional): Transfer from these, defaults to every
+            rigid and constraint with the source fragment in its path
+        opts (dict, optional): Same as transfer_attributes
+
+    Returns:
+        pairs (list): Each (source, destination) that was transferred
+
+    """
+
+    opts = opts or {}
+    opts = dict({"mirror": True}, **opts)
+    src, dst = rule
+
+    assert src and src != dst, "'%s' -> '%s' was not a rule" % (src, dst)
+
+    existing = {
+        node.path(): node
+        for node in i__.node_index.ls(["rdRigid", "rdConstraint"])
+    }
+
+    if nodes is None:
+        nodes = existing.values()
+
+    sources = []
+    for node in nodes:
+        if isinstance(node, i__.string_types):
+            node = cmdx.encode(node)
+
+        if node.isA(cmdx.kTransform):
+            sources.extend(node.shapes(type=("rdRigid", "rdConstraint")))
+        else:
+            sources.append(node)
+
+    pairs = []
+    for node in sources:
+        path = node.path()
+
+        if src not in path:
+            continue
+
+        other = existing.get(path.replace(src, dst))
+
+        if other is None:
+            log.warning("%s had no counterpart, skipping" % path)
+            continue
+
+        if other.type() == node.type():
+            pairs += [(node, other)]
+
+    with cmdx.DagModifier() as mod:
+        for a, b in pairs:
+            if a.type() == "rdRigid":
+                _transfer_rigid(mod, a, b)
+
+        _transfer_constraints(mod, [
+            (a, b) for a, b in pairs if a.type() == "rdConstraint"
+        ], mirror=opts["mirror"])
+
+    return pairs
+
+
 @i__.with_undo_chunk
 def transfer_rigid(ra, rb):
     if isinstance(ra, i__.string_types):
@@ -1002,6 +1650,11 @@ def transfer_rigid(ra, rb):
     if isinstance(rb, i__.string_types):
         rb = cmdx.encode(rb)
 
+    with cmdx.DagModifier() as mod:
+        _transfer_rigid(mod, ra, rb)
+
+
+def _transfer_rigid(mod, ra, rb):
     rigid_attributes = (
         "collide",
         "mass",
@@ -1014,17 +1667,16 @@ def transfer_rigid(ra, rb):
         "shapeOffset",
     )
 
-    with cmdx.DagModifier() as mod:
-        for attr in rigid_attributes:
-
-            # Account for locked attributes
-            try:
-                # Account for user attributes
-                mod.smart_set_attr(rb[attr], ra[attr])
-            except cmdx.LockedError:
-                log.warning(
-                    "%s was locked and wasn't changed" % rb[attr].path()
-                )
+    for attr in rigid_attributes:
+
+        # Account for locked attributes
+        try:
+            # Account for user attributes
+            mod.smart_set_attr(rb[attr], ra[attr])
+        except cmdx.LockedError:
+            log.warning(
+                "%s was locked and wasn't changed" % rb[attr].path()
+            )
 
 
 @i__.with_undo_chunk
@@ -1038,6 +1690,28 @@ def transfer_constraint(ca, cb, opts=None):
     opts = opts or {}
     opts = dict({"mirror": True}, **opts)
 
+    with cmdx.DagModifier() as mod:
+        _transfer_constraints(mod, [(ca, cb)], mirror=opts["mirror"])
+
+
+# Reflect across the XY plane, i.e. negate translate Z along with
+# rotate X and Y, by flipping the sign of each affected element
+_MirrorSigns = (
+    1, 1, -1, 1,
+    1, 1, -1, 1,
+    -1, -1, 1, -1,
+    1, 1, -1, 1,
+)
+
+
+def _mirror_matrices(matrices):
+    return [
+        cmdx.Mat4(tuple(v * s for v, s in zip(matrix, _MirrorSigns)))
+        for matrix in matrices
+    ]
+
+
+def _transfer_constraints(mod, pairs, mirror=True):
     constraint_attributes = (
         "type",
         "limitStrength",
@@ -1045,32 +1719,21 @@ def transfer_constraint(ca, cb, opts=None):
         "drawScale",
     )
 
-    with cmdx.DagModifier() as mod:
-        for attr in constraint_attributes:
-            mod.set_attr(cb[attr], ca[attr])
-
-    # Mirror frames
-    parent_frame = cmdx.Tm(ca["parentFrame"].asMatrix())
-    child_frame = cmdx.Tm(ca["childFrame"].asMatrix())
-
-    def _mirror(tm):
-        t = tm.translation()
-        r = tm.rotation()
-
-        t.z *= -1
-        r.x *= -1
-        r.y *= -1
+    parent_frames = [ca["parentFrame"].asMatrix() for ca, _ in pairs]
+    child_frames = [ca["childFrame"].asMatrix() for ca, _ in pairs]
 
-        tm.setTranslation(t)
-        tm.setRotation(r)
+    if mirror:
+        parent_frames = _mirror_matrices(parent_frames)
+        child_frames = _mirror_matrices(child_frames)
 
-    if opts["mirror"]:
-        _mirror(parent_frame)
-        _mirror(child_frame)
+    for (ca, cb), parent_frame, child_frame in zip(pairs,
+                                                   parent_frames,
+                                                   child_frames):
+        for attr in constraint_attributes:
+            mod.set_attr(cb[attr], ca[attr])
 
-    with cmdx.DagModifier() as mod:
-        mod.set_attr(cb["parentFrame"], parent_frame.asMatrix())
-        mod.set_attr(cb["childFrame"], child_frame.asMatrix())
+        mod.set_attr(cb["parentFrame"], parent_frame)
+        mod.set_attr(cb["childFrame"], child_frame)
 
 
 @i__.with_undo_chunk
@@ -1313,7 +1976,7 @@ def duplicate(rigid):
     return dup
 
 
-def infer_geometry(root, parent=None, children=None):
+def infer_geometry(root, parent=None, children=None, _world=None):
     """Find length and orientation from `root`
 
     This function looks at the child and parent of
@@ -1324,9 +1987,23 @@ def infer_geometry(root, parent=None, children=None):
 
     Arguments:
         root (root): The root from which to derive length and orientation
+        _world (dict, optional): World transforms by node hex, shared
+            between calls such that each node is only queried once.
+            Missing transforms are fetched and added.
 
     """
 
+    if _world is None:
+        _world = {}
+
+    def world(node):
+        try:
+            return _world[node.hex]
+        except KeyError:
+            tm = node.transform(cmdx.sWorld)
+            _world[node.hex] = tm
+            return tm
+
     class Geometry(object):
         __slots__ = [
             "orient",
@@ -1369,11 +2046,12 @@ def infer_geometry(root, parent=None, children=None):
     # Special case of not wanting to use childhood, but
     # rather share whatever geometry the parent has
     if children is False and parent is not None:
-        if "_rdGeometry" in parent.data:
-            parent_geometry = parent.data.get("_rdGeometry")
+        parent_geometry = _cached_geometry(parent, world)
+
+        if parent_geometry is not None:
             return parent_geometry
 
-    root_tm = root.transform(cmdx.sWorld)
+    root_tm = world(root)
     root_pos = root_tm.translation()
     root_scale = root_tm.scale()
 
@@ -1390,7 +2068,7 @@ def infer_geometry(root, parent=None, children=None):
         #
         positions = []
         for child in children:
-            positions += [child.transform(cmdx.sWorld).translation()]
+            positions += [world(child).translation()]
 
         pos2 = cmdx.Vector()
         for pos in positions:
@@ -1426,7 +2104,7 @@ def infer_geometry(root, parent=None, children=None):
                 parent = center_node.child(type=root.type())
 
             if parent:
-                up = parent.transform(cmdx.sWorld).translation()
+                up = world(parent).translation()
                 up = (up - root_pos).normal()
             else:
                 up = cmdx.up_axis()
@@ -1438,7 +2116,7 @@ def infer_geometry(root, parent=None, children=None):
             orient *= cmdx.Quaternion(cmdx.Vector(0, 1, 0), up)
             orient *= cmdx.Quaternion(orient * cmdx.Vector(1, 0, 0), aim)
 
-            center_node_pos = center_node.transform(cmdx.sWorld).translation()
+            center_node_pos = world(center_node).translation()
             length = (center_node_pos - root_pos).length()
 
             geometry.orient = orient
@@ -1516,12 +2194,12 @@ def infer_geometry(root, parent=None, children=None):
 
             """
 
-            pos1 = root.transform(cmdx.sWorld).translation()
+            pos1 = world(root).translation()
             positions = [pos1]
 
             # Start by figuring out a center point
             for child in root.children(type=root.type()):
-                positions += [child.transform(cmdx.sWorld).translation()]
+                positions += [world(child).translation()]
 
             center = cmdx.Vector()
             for pos in positions:
@@ -1585,14 +2263,100 @@ def infer_geometry(root, parent=None, children=None):
     if abs(root_scale.z) <= 0:
         geometry.extents.z = 0
 
-    # Store for subsequent accesses
-    root.data["_rdGeometry"] = geometry
+    # Store for subsequent accesses, along with what it was based on
+    root.data["_rdGeometry"] = (
+        geometry, children or [], _geometry_key(root, children, world)
+    )
+
+    return geometry
+
+
+def _geometry_key(root, children, world):
+    """Summarise the transforms geometry of `root` is computed from"""
+    key = tuple(world(root).asMatrix())
+
+    for child in children or []:
+        key += tuple(world(child).translation())
+
+    return key
+
+
+def _cached_geometry(root, world):
+    """Return geometry previously inferred for `root`, unless stale
+
+    Geometry is only reused if `root` and the children it was
+    computed from have not moved since.
+
+    """
+
+    try:
+        geometry, children, key = root.data["_rdGeometry"]
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    if any(not child.exists for child in children):
+        return None
+
+    if key != _geometry_key(root, children, world):
+        return None
 
     return geometry
 
 
+def infer_geometries(nodes, parents=None, children=None, _cache=None):
+    """Infer geometry for each of `nodes` in one pass
+
+    Like calling :func:`infer_geometry` per node, except the world
+    transform of every node involved, including parents and children,
+    is read once up-front and shared between them.
+
+    Arguments:
+        nodes (list): Nodes from which to derive length and orientation
+        parents (list, optional): Parent per node, see :func:`infer_geometry`
+        children (list, optional): Children per node,
+            see :func:`infer_geometry`
+        _cache (Snapshot, optional): Reach for world matrices here first
+
+    Returns:
+        geometries (list): One per node, in the order given
+
+    """
+
+    nodes = list(nodes)
+    parents = parents or [None] * len(nodes)
+    children = children or [None] * len(nodes)
+    cache = _cache if _cache is not None else i__.Snapshot()
+
+    # Same default as infer_geometry, fetched here so as to be read below
+    children = [
+        list(node.children(type=node.type())) if kids is None else kids
+        for node, kids in zip(nodes, children)
+    ]
+
+    related = {}
+    for node, parent, kids in zip(nodes, parents, children):
+        parent = parent or node.parent(type=node.type())
+
+        for other in [node, parent] + (kids or []):
+            if other is not None:
+                related[other.hex] = other
+
+    cache.capture([
+        node for node in related.values()
+        if (node, "worldMatrix") not in cache
+    ], ("worldMatrix",))
+
+    world = {key: cache.transform(node) for key, node in related.items()}
+
+    return [
+        infer_geometry(node, parent=parent, children=kids, _world=world)
+        for node, parent, kids in zip(nodes, parents, children)
+    ]
+
+
 @i__.with_undo_chunk
 @i__.with_refresh_suspended
+@i__.with_timing
 def delete_physics(nodes):
     """Delete Ragdoll from anything related to `nodes`
 
@@ -1629,84 +2393,92 @@ def delete_physics(nodes):
 
     # Filter by our types
     all_nodetypes = cmds.pluginInfo("ragdoll", query=True, dependNode=True)
-    ragdoll_nodes = list(
-        node for node in nodes
-        if node.type() in all_nodetypes
-    )
+    all_nodetypes = set(all_nodetypes)
+
+    ragdoll_nodes = []
+    seen = set()
+    for node in nodes:
+        if node.hex in seen or node.type() not in all_nodetypes:
+            continue
+
+        seen.add(node.hex)
+        ragdoll_nodes.append(node)
 
     # Nothing to do!
     if not ragdoll_nodes:
         return result
 
-    # Delete transforms exclusively made for Ragdoll nodes.
+    # Delete transforms exclusively made for Ragdoll nodes, along with
+    # attributes added onto Ragdoll interfaces, such as the original
+    # animation controls. Both are found in one pass over each node.
     #  _____________________       ___________________
     # |                     |     |                   |
     # | Rigid               |     | Transform         |
     # |                     |     |                   |
     # |      exclusives [0] o<----o message           |
+    # |  userAttributes [0] o<----o mass              |
+    # |                 [1] o<----o stiffness         |
     # |_____________________|     |___________________|
     #
     #
     exclusives = list()
-    for node in ragdoll_nodes:
-        if "exclusiveNodes" not in node:
-            continue
+    user_attributes = dict()
 
-        for element in node["exclusiveNodes"]:
-            other = element.connection(source=True, destination=False)
-
-            if other is not None:
+    for node in ragdoll_nodes:
+        for other, plug in node.connections(plugs=True,
+                                            source=True,
+                                            destination=False,
+                                            connections=True):
+            name = plug.name()
+
+            if name.startswith("exclusiveNodes["):
+                other = other.node()
                 assert isinstance(other, cmdx.Node), "This is a bug in cmdx"
-                exclusives.append(other)
 
-    # Delete attributes from Ragdoll interfaces,
-    # such as on the original animation controls.
-    #
-    #  ______________________       ___________________
-    # |                      |     |                   |
-    # | Rigid                |     | Transform         |
-    # |                      |     |                   |
-    # |   userAttributes [0] o<----o mass              |
-    # |                  [1] o<----o stiffness         |
-    # |______________________|     |___________________|
-    #
-    #
-    user_attributes = set()
-
-    for node in ragdoll_nodes:
-        if "userAttributes" not in node:
-            continue
+                if other.hex not in seen:
+                    seen.add(other.hex)
+                    exclusives.append(other)
 
-        for element in node["userAttributes"]:
-            user_attribute = element.connection(plug=True,
-                                                source=True,
-                                                destination=False)
-            if user_attribute is not None:
-                user_attributes.add(user_attribute)
+            elif name.startswith("userAttributes["):
+                user_attributes[other.path()] = other
 
     result["deletedRagdollNodeCount"] = len(ragdoll_nodes)
     result["deletedExclusiveNodeCount"] = len(exclusives)
     result["deletedUserAttributeCount"] = len(user_attributes)
 
-    # Delete attributes first, as they may otherwise
-    # disappear along with their node.
+    # Deleting a shape whose parent transform has no other children
+    # automatically deletes the transform too, and deleting a transform
+    # deletes its children. So only delete the top-most of each
+    # hierarchy and let Maya take care of the rest, such that nothing
+    # is ever deleted twice.
+    def is_covered(node):
+        parent = node.parent() if isinstance(node, cmdx.DagNode) else None
+
+        while parent is not None:
+            if parent.hex in seen:
+                return True
+            parent = parent.parent()
+
+        return False
+
+    deletions = [
+        node for node in ragdoll_nodes + exclusives
+        if not is_covered(node)
+    ]
+
+    # Attributes on nodes about to be deleted go along with them
+    attributes = [
+        attr for attr in user_attributes.values()
+        if attr.node().hex not in seen and not is_covered(attr.node())
+    ]
+
+    # Everything is queued up-front and committed once, on exit
     with cmdx.DagModifier() as mod:
-        for attr in user_attributes:
+        for attr in attributes:
             mod.delete_attr(attr)
 
-        mod.do_it()
-
-        for node in ragdoll_nodes + exclusives:
-            try:
-                mod.delete(node)
-                mod.do_it()
-
-            except cmdx.ExistError:
-                # Deleting a shape whose parent transform has no other shape
-                # automatically deletes the transform. This is shit behavior
-                # that can be corrected in Maya 2022 onwards,
-                # via includeParents=False
-                pass
+        for node in deletions:
+            mod.delete(node)
 
     return result
 
@@ -1718,8 +2490,7 @@ def delete_all_physics():
 
     """
 
-    all_nodetypes = cmds.pluginInfo("ragdoll", query=True, dependNode=True)
-    return delete_physics(cmdx.ls(type=all_nodetypes))
+    return delete_physics(i__.node_index.ls())
 
 
 @i__.with_undo_chunk
@@ -1736,40 +2507,88 @@ def normalise_shapes(root, max_delta=0.25):
     low = 1 - max_delta
     high = 1 + max_delta
 
-    def get_radius(rigid):
-        return max(0.1, rigid["shapeRadius"].read())
-
     root_rigid = root.shape(type="rdRigid")
 
     if not root_rigid:
         return
 
-    last_radius = get_radius(root_rigid)
-    hierarchy = list(root.descendents(type="rdRigid"))
+    # In no particular order; a rigid is created after the children of
+    # its transform and so is typically listed after theirs too
+    rigids = root.hierarchy(type="rdRigid", filter=cmdx.kShape)
 
-    # This is our base
-    hierarchy.remove(root_rigid)
+    if root_rigid not in rigids:
+        rigids.insert(0, root_rigid)
 
-    with cmdx.DagModifier() as mod:
-        for rigid in hierarchy:
-            radius = get_radius(rigid)
+    # Rigids are shapes, so find each parent by way of its transform
+    #
+    #   o rigid0
+    #   |
+    #   o---o rigid1   <-- parent is 0
+    #       |
+    #       o   <-- no rigid here
+    #       |
+    #       o rigid2   <-- parent is 1
+    #
+    index_by_transform = {
+        rigid.parent().hex: index
+        for index, rigid in enumerate(rigids)
+    }
+
+    root_index = rigids.index(root_rigid)
+    parents = []
+
+    for rigid in rigids:
+        parent_index = root_index
+
+        ancestor = rigid.parent().parent()
+        while ancestor is not None:
+            if ancestor.hex in index_by_transform:
+                parent_index = index_by_transform[ancestor.hex]
+                break
+
+            ancestor = ancestor.parent()
+
+        parents.append(parent_index)
+
+    # Breadth-first from the root, such that parents
+    # always come before their children
+    children = [[] for _ in rigids]
+    for index, parent_index in enumerate(parents):
+        if index != root_index:
+            children[parent_index].append(index)
 
-            ratio = radius / last_radius
-            new_radius = radius
+    order = [root_index]
+    for index in order:
+        order.extend(children[index])
 
-            if ratio < low:
-                new_radius = last_radius * low
+    # Read everything up-front..
+    radii = [max(0.1, rigid["shapeRadius"].read()) for rigid in rigids]
+    extents = [rigid["shapeExtents"].read() for rigid in rigids]
 
-            if ratio > high:
-                new_radius = last_radius * high
+    # ..clamp each rigid relative its parent, parents first..
+    new_radii = list(radii)
+    for index in order[1:]:
+        parent_radius = new_radii[parents[index]]
+        ratio = radii[index] / parent_radius
 
-            # new_ratio = radius / new_radius
-            new_extents = rigid["shapeExtents"].as_vector()
-            new_extents.y = new_radius * 2
-            new_extents.z = new_radius * 2
+        if ratio < low:
+            new_radii[index] = parent_radius * low
+
+        elif ratio > high:
+            new_radii[index] = parent_radius * high
+
+    # ..and write them all at once
+    with cmdx.DagModifier() as mod:
+        for index, (rigid, new_radius, extent) in enumerate(zip(rigids,
+                                                                new_radii,
+                                                                extents)):
+            if index == root_index:
+                continue
 
             mod.set_attr(rigid["shapeRadius"], new_radius)
-            mod.set_attr(rigid["shapeExtents"], new_extents)
+            mod.set_attr(rigid["shapeExtents"], (
+                extent[0], new_radius * 2, new_radius * 2
+            ))
 
 
 @i__.with_undo_chunk
@@ -1884,6 +2703,122 @@ def convert_to_polygons(actor, worldspace=True):
     return mesh
 
 
+@i__.with_undo_chunk
+def combine_polygons(actors, worldspace=True, bake=None):
+    """Convert many rigids or controls into a single polygonal surface
+
+    Like convert_to_polygons, except every actor shares one mesh, with
+    faces coloured per actor. The faces of each actor start at the
+    corresponding index of the `.faceOffsets` attribute, in the order
+    of the `.actors` attribute.
+
+    Arguments:
+        actors (list): Rigids or controls to generate a mesh from
+        worldspace (bool): Move verticies to worldspace
+        bake (tuple, optional): Write vertex positions from this start
+            to end frame into a geometry cache next to the Maya scene,
+            and play the mesh back from it
+
+    """
+
+    assert isinstance(actors, (tuple, list)), "%s was not a list" % actors
+    assert actors, "No actors given"
+
+    for actor in actors:
+        assert "outputMesh" in actor, (
+            "%s did not have an .outputMesh attribute" % actor
+        )
+
+    with cmdx.DagModifier() as mod:
+        tm = mod.create_node("transform", name="combinedPolygons")
+        mesh = mod.create_node("mesh", name=tm.name() + "Shape", parent=tm)
+        mod.set_attr(mesh["displayColors"], True)
+        mod.set_attr(mesh["displayColorChannel"], "Diffuse")
+
+        mod.add_attr(mesh, cmdx.Message("actors", array=True))
+        mod.add_attr(mesh, cmdx.Long("faceOffsets", array=True))
+
+    offsets = []
+    faces_by_color = {}
+    count = 0
+
+    for actor in actors:
+        data = actor["outputMesh"].plug().asMObject()
+        faces = cmdx.om.MFnMesh(data).numPolygons
+        color = tuple(actor["color"].read())
+
+        if faces:
+            faces_by_color.setdefault(color, []).append(
+                "%s.f[%d:%d]" % (mesh.path(), count, count + faces - 1)
+            )
+
+        offsets += [count]
+        count += faces
+
+    with cmdx.DGModifier() as mod:
+        unite = mod.create_node("polyUnite", name="combinePolygons")
+        mod.set_attr(unite["isHistoricallyInteresting"], False)
+
+        for index, (actor, offset) in enumerate(zip(actors, offsets)):
+            mod.connect(actor["outputMesh"], unite["inputPoly"][index])
+            mod.connect(actor["message"], mesh["actors"][index])
+            mod.set_attr(mesh["faceOffsets"][index], offset)
+
+            if worldspace:
+                mod.connect(actor.parent()["worldMatrix"][0],
+                            unite["inputMat"][index])
+
+        mod.connect(unite["output"], mesh["inMesh"])
+
+    # Transfer colors from our precious actors, into the history
+    # of the mesh, with one node per color rather than per actor
+    for color, faces in faces_by_color.items():
+        cmds.polyColorPerVertex(faces, rgb=color)
+
+    # Assign default shader
+    lambert = cmdx.encode("initialShadingGroup")
+    lambert.add(mesh)
+
+    if bake is not None:
+        _bake_points(mesh, *bake)
+
+    return mesh
+
+
+def _bake_points(mesh, start, end):
+    """Cache vertex positions of `mesh` to disk, and play back from there
+
+    The cache is attached via a historySwitch, like Maya's own
+    Create Geometry Cache, such that the mesh is read from disk
+    in place of evaluating its history.
+
+    """
+
+    fname = cmds.file(query=True, sceneName=True)
+    directory = (
+        os.path.dirname(fname) if fname
+        else cmds.workspace(query=True, rootDirectory=True)
+    )
+
+    name = mesh.parent().name()
+    cmds.cacheFile(fileName=name,
+                   directory=directory,
+                   points=mesh.path(),
+                   startTime=start,
+                   endTime=end,
+                   format="OneFile")
+
+    switch = mel.eval('createHistorySwitch("%s", false)' % mesh.path())
+    cmds.cacheFile(attachFile=True,
+                   fileName=name,
+                   directory=directory,
+                   channelName=mesh.name(),
+                   inAttr=switch + ".inp[0]")
+    cmds.setAttr(switch + ".playFromCache", True)
+
+    log.info("Baked %s to %s" % (mesh, directory))
+
+
 """
 
 Internal helper functions
@@ -2001,7 +2936,7 @@ def _interpret_shape(mod, rigid, shape):
     _shapeattributes_from_generator(mod, shape, rigid)
 
 
-def _interpret_transform(mod, rigid, transform):
+def _interpret_transform(mod, rigid, transform, geometry=None):
     """Translate `transform` into rigid shape attributes
 
     Primarily joints, that have a radius and length.
@@ -2013,7 +2948,7 @@ def _interpret_transform(mod, rigid, transform):
 
         # Orient inner shape to wherever the joint is pointing
         # as opposed to whatever its jointOrient is facing
-        geometry = infer_geometry(transform)
+        geometry = geometry or infer_geometry(transform)
 
         mod.set_attr(rigid["shapeOffset"], geometry.shape_offset)
         mod.set_attr(rigid["shapeRotation"], geometry.shape_rotation)
@@ -2188,7 +3123,7 @@ def _add_rigid(mod, rigid, scene):
     )
 
     time = cmdx.encode("time1")
-    index = scene["outputObjects"].next_available_index()
+    index = scene["outputObjects"].next_available_index(mod=mod)
     mod.connect(time["outTime"], rigid["currentTime"])
     mod.connect(scene["outputObjects"][index], rigid["nextState"])
     mod.connect(scene["startTime"], rigid["startTime"])
@@ -2203,7 +3138,7 @@ def _add_constraint(mod, con, scene):
     )
 
     time = cmdx.encode("time1")
-    index = scene["inputConstraintStart"].next_available_index()
+    index = scene["inputConstraintStart"].next_available_index(mod=mod)
 
     mod.connect(time["outTime"], con["currentTime"])
     mod.connect(con["startState"], scene["inputConstraintStart"][index])
@@ -2335,6 +3270,34 @@ def _connect_active(mod, rigid, transform, existing=c.Overwrite):
     return pair_blend
 
 
+def _connect_active_lean(mod, rigid, transform):
+    r"""Connect `rigid` to `transform` directly
+
+     ______
+    |\     \
+    | \_____\                /
+    | |     | . . . . . . - o -
+    \ |     |              /
+     \|_____|
+
+    Unlike :func:`_connect_active`, no pairBlend, composeMatrix or
+    multMatrix is made, leaving nothing else to evaluate each frame.
+    The cost is that simulation cannot be blended with animation,
+    and the input matrix is the rest matrix set on creation.
+
+    """
+
+    _connect_transform(mod, rigid, transform)
+
+
+def _is_animated(transform):
+    """Return whether translate or rotate of `transform` has an input"""
+    return any(
+        transform[attr].connected
+        for attr in ("tx", "ty", "tz", "rx", "ry", "rz")
+    )
+
+
 def _remove_pivots(mod, transform):
     # Remove unsupported additional transforms
     for channel in ("rotatePivot",
@@ -2418,6 +3381,36 @@ def _anim_constraint(rigid, active=False):
     return con
 
 
+def _set_constraint_type(mod, con, type):
+    """Apply the limits and drives that make up a constraint of `type`"""
+    mod.set_attr(con["type"], type)
+    mod.set_attr(con["limitEnabled"], True)
+    mod.set_attr(con["limitStrength"], 1)
+
+    if type == c.SocketConstraint:
+        mod.set_attr(con["driveEnabled"], True)
+        mod.set_attr(con["driveStrength"], 1)
+        mod.set_attr(con["linearDriveStiffness"], 0)
+        mod.set_attr(con["linearDriveDamping"], 0)
+
+    # Linear and angular limits, -1 means locked
+    limits = {
+        c.PointConstraint: ((-1, -1, -1), (0, 0, 0)),
+        c.OrientConstraint: ((0, 0, 0), (-1, -1, -1)),
+        c.HingeConstraint: ((-1, -1, -1), (45, -1, -1)),
+        c.SocketConstraint: ((-1, -1, -1), (45, 45, 45)),
+        c.ParentConstraint: ((-1, -1, -1), (-1, -1, -1)),
+    }[type]
+
+    linear, angular = limits
+
+    for axis, value in zip("XYZ", linear):
+        mod.set_attr(con["linearLimit" + axis], value)
+
+    for axis, value in zip("XYZ", angular):
+        mod.set_attr(con["angularLimit" + axis], cmdx.radians(value))
+
+
 def _reset_constraint(mod, con, opts=None):
     """Reset a constraint
 
@@ -108,6 +108,11 @@ def _before_scene_new(*args):
     cmdx.uninstall()
 
 
+def _before_plugin_unload(*args):
+    # Attributes of an unloaded plug-in leave their handles up for grabs
+    cmdx.clearAttributeCaches()
+
+
 def requires_ui(func):
     """Wrapper for functions that rely on being displayed
 
@@ -289,6 +294,8 @@ def _on_licence_expired(clientData=None):
 
 
 def install_callbacks():
+    i__.node_index.install()
+
     __.callbacks.append(
         om.MSceneMessage.addCallback(
             om.MSceneMessage.kBeforeOpen, _before_scene_open)
@@ -304,6 +311,11 @@ def install_callbacks():
             om.MSceneMessage.kBeforeNew, _before_scene_new)
     )
 
+    __.callbacks.append(
+        om.MSceneMessage.addStringArrayCallback(
+            om.MSceneMessage.kBeforePluginUnload, _before_plugin_unload)
+    )
+
     __.callbacks.append(
         om.MUserEventMessage.addUserEventCallback(
             "ragdollCycleEvent", _on_cycle)
@@ -320,6 +332,8 @@ def uninstall_callbacks():
         om.MMessage.removeCallback(callback_id)
     __.callbacks[:] = []
 
+    i__.node_index.uninstall()
+
 
 def install_plugin():
     os.environ["XBMLANGPATH"] = os.pathsep.join([
@@ -351,6 +365,7 @@ def uninstall_plugin(force=True):
     cmds.file(new=True, force=force)
 
     if cmds.pluginInfo(c.RAGDOLL_PLUGIN_NAME, query=True, loaded=True):
+        cmdx.clearAttributeCaches()
         cmds.unloadPlugin(c.RAGDOLL_PLUGIN_NAME)
 
     # Restore environment
@@ -543,7 +558,9 @@ def install_menu():
         item("transferAttributes", transfer_selected)
 
         if c.RAGDOLL_DEVELOPER:
-            item("convertToPolygons", convert_to_polygons)
+            item("convertToPolygons",
+                 convert_to_polygons,
+                 convert_to_polygons_options)
             item("normaliseShapes", normalise_shapes)
 
         item("setInitialState", set_initial_state)
@@ -710,7 +727,7 @@ def _find_current_scene(autocreate=True):
         except cmdx.ExistError:
             # Ok, no persistent clue or request for a new scene
             try:
-                scene = cmdx.ls(type="rdScene")[0]
+                scene = i__.node_index.ls("rdScene")[0]
 
             # Nothing in sight, now it's up to the function
             except IndexError:
@@ -1039,59 +1056,73 @@ def create_active_rigid(selection=None, **opts):
     if not scene:
         return
 
-    for index, node in enumerate(selection):
-        transform = node.parent() if node.isA(cmdx.kShape) else node
+    existing = {
+        "Abort": c.Abort,
+        "Overwrite": c.Overwrite,
+        "Blend": c.Blend,
+    }.get(_opt("existingAnimation", opts), "Overwrite")
 
-        existing = {
-            "Abort": c.Abort,
-            "Overwrite": c.Overwrite,
-            "Blend": c.Blend,
-        }.get(_opt("existingAnimation", opts), "Overwrite")
-
-        opts = {
-            "computeMass": _opt("computeMass", opts),
-            "passive": passive,
-            "existing": existing,
-            "defaults": {}
+    blend = _opt("existingAnimation", opts) == "Blend"
+
+    rigid_opts = {
+        "computeMass": _opt("computeMass", opts),
+        "passive": passive,
+        "existing": existing,
+        "defaults": {}
+    }
+
+    # Translate UI options into attribute defaults
+    initial_shape = _opt("initialShape", opts)
+    if initial_shape != "Auto":
+        shapes = {
+            "Box": c.BoxShape,
+            "Sphere": c.SphereShape,
+            "Capsule": c.CapsuleShape,
+            "Mesh": c.ConvexHullShape,
         }
 
-        # Translate UI options into attribute defaults
-        initial_shape = _opt("initialShape", opts)
-        if initial_shape != "Auto":
-            shapes = {
-                "Box": c.BoxShape,
-                "Sphere": c.SphereShape,
-                "Capsule": c.CapsuleShape,
-                "Mesh": c.ConvexHullShape,
-            }
-
-            opts["defaults"]["shapeType"] = shapes.get(
-                initial_shape,
-
-                # Fallback, this should never really happen
-                c.BoxShape
-            )
+        rigid_opts["defaults"]["shapeType"] = shapes.get(
+            initial_shape,
 
-        # Preserve animation, if any, as soft constraints
-        is_connected = any(
-            transform[attr].connected for attr in ("tx", "ty", "tz",
-                                                   "rx", "ry", "rz"))
+            # Fallback, this should never really happen
+            c.BoxShape
+        )
+
+    nodes = []
+    transforms = []
+    is_connected = []
+    for node in selection:
+        # Skip what can't be made into a rigid,
+        # rather than let it stop the rest
         try:
-            rigid = commands.create_rigid(node, scene,
-                                          opts=opts)
-        except Exception as e:
-            _print_exception()
+            transform, _ = commands.rigid_target(node)
+        except AssertionError as e:
             log.error(str(e))
             continue
 
-        # There may have been an error
-        if not rigid:
+        # E.g. both a transform and its shape was selected
+        if transform in transforms:
             continue
 
+        # Preserve animation, if any, as soft constraints
+        is_connected += [any(
+            transform[attr].connected for attr in ("tx", "ty", "tz",
+                                                   "rx", "ry", "rz"))]
+        transforms += [transform]
+        nodes += [node]
+
+    try:
+        rigids = commands.create_rigids(nodes, scene, opts=rigid_opts)
+    except Exception as e:
+        _print_exception()
+        log.error(str(e))
+        rigids = []
+
+    for rigid, connected in zip(rigids, is_connected):
         created += [rigid]
 
-        if not passive and _opt("existingAnimation", opts) == "Blend":
-            con = commands._anim_constraint(rigid, active=is_connected)
+        if not passive and blend:
+            con = commands._anim_constraint(rigid, active=connected)
             created += [con]
 
     if created:
@@ -1145,6 +1176,8 @@ def create_active_chain(selection=None, **opts):
         if link.shape("rdRigid") is not None:
             return log.warning("Already dynamic: '%s'" % link)
 
+    split = _opt("chainSplit", opts)
+
     opts = {
         "autoMultiplier": _opt("chainAutoMultiplier", opts),
         "autoLimits": _opt("chainAutoLimits", opts),
@@ -1178,14 +1211,44 @@ def create_active_chain(selection=None, **opts):
     if not scene:
         return
 
-    tools.create_chain(links, scene, opts=opts, defaults=defaults)
+    chains = _split_chains(links) if split else [links]
 
-    root = links[0]
-    cmds.select(str(root))
+    if len(chains) > 1:
+        tools.create_chains(chains, scene, opts=opts, defaults=defaults)
+        cmds.select(list(str(chain[0]) for chain in chains))
+
+    else:
+        tools.create_chain(links, scene, opts=opts, defaults=defaults)
+        cmds.select(str(links[0]))
 
     return kSuccess
 
 
+def _split_chains(links):
+    """Separate `links` into one chain per unbroken hierarchy
+
+    E.g. the tails of several characters, selected one after the other.
+    Links that aren't all part of a hierarchy, such as free-floating
+    boxes, remain one chain. Only done when asked to, via the
+    "chainSplit" option, as a chain may otherwise consist of links
+    from separate hierarchies.
+
+    """
+
+    chains = [[links[0]]]
+
+    for link in links[1:]:
+        if chains[-1][-1] in link.lineage():
+            chains[-1].append(link)
+        else:
+            chains.append([link])
+
+    if any(len(chain) < 2 for chain in chains):
+        return [links]
+
+    return chains
+
+
 @i__.with_undo_chunk
 def create_link(*args):
     links = []
@@ -1212,21 +1275,24 @@ def _axis_to_vector(axis="x"):
 
 @i__.with_undo_chunk
 def create_muscle(selection=None, **opts):
-    try:
-        a, b = selection or cmdx.selection()
-    except ValueError:
+    selection = selection or cmdx.selection()
+
+    # Root and tip anchors of one or more muscles, one after the other
+    if not selection or len(selection) % 2:
         return log.warning("Select root and tip anchors of new muscle")
 
-    if not all(node.isA(cmdx.kTransform) for node in (a, b)):
+    if not all(node.isA(cmdx.kTransform) for node in selection):
         return log.error(
             "Select two transforms for root and tip anchors of muscle"
         )
 
-    if not all(node.parent() for node in (a, b)):
+    if not all(node.parent() for node in selection):
         return log.error(
             "Anchors must have a parent, see muscle documentation for details"
         )
 
+    pairs = list(zip(selection[0::2], selection[1::2]))
+
     new_scene = not cmdx.ls(type="rdScene")
     scene = _find_current_scene()
 
@@ -1248,9 +1314,9 @@ def create_muscle(selection=None, **opts):
         "radius": _opt("muscleRadius", opts),
     }
 
-    muscle, root, tip = tools.create_muscle(a, b, scene, **kwargs)
+    muscles = tools.create_muscles(pairs, scene, **kwargs)
 
-    cmds.select(muscle.parent().path())
+    cmds.select([muscle.parent().path() for muscle, _, _ in muscles])
     return kSuccess
 
 
@@ -1334,7 +1400,7 @@ def create_character(selection=None, **opts):
 
     hierarchy = [root]
     hierarchy += [
-        joint for joint in root.descendents(type="joint")
+        joint for joint in root.hierarchy(type="joint", filter=cmdx.kJoint)
         if joint.child(type="joint")
     ]
 
@@ -1671,8 +1737,18 @@ def create_kinematic_control(selection=None, **opts):
 
 @i__.with_undo_chunk
 def transfer_selected(selection=None):
+    selection = selection or cmdx.selection()
+
+    if len(selection) > 2:
+        # Mirror each selected node onto its counterpart, all at once
+        pairs = commands.transfer_rig(nodes=selection,
+                                      opts={"mirror": True})
+
+        log.info("Transferred attributes of %d pairs", len(pairs))
+        return kSuccess
+
     try:
-        a, b = selection or cmdx.selection()
+        a, b = selection
     except ValueError:
         return log.warning(
             "Select source and destination rigids, in that order"
@@ -1919,8 +1995,8 @@ Dynamic Control has been updated and renamed Active Chain
 
 
 @i__.with_undo_chunk
-def convert_to_polygons(selection=None):
-    meshes = []
+def convert_to_polygons(selection=None, **opts):
+    actors = []
 
     for node in cmdx.selection(type=("transform", "rdRigid", "rdControl")):
         actor = node
@@ -1932,12 +2008,21 @@ def convert_to_polygons(selection=None):
             log.warning("%s was not a rdRigid or rdControl" % node)
             continue
 
-        mesh = commands.convert_to_polygons(actor)
-        meshes += [mesh.parent().path()]
+        actors += [actor]
+
+    if actors and _opt("convertCombine", opts):
+        mesh = commands.combine_polygons(actors)
+        meshes = [mesh.parent().path()]
+
+    else:
+        meshes = [
+            commands.convert_to_polygons(actor).parent().path()
+            for actor in actors
+        ]
 
     if meshes:
         cmds.select(meshes)
-        log.info("Converted %d rigids to polygons" % len(meshes))
+        log.info("Converted %d rigids to polygons" % len(actors))
         return kSuccess
     else:
         return log.warning("Nothing converted")
@@ -1999,7 +2084,10 @@ def select_type(typ):
         if selection:
             cmds.select(cmds.ls(selection, type=typ))
         else:
-            cmds.select(cmds.ls(type=typ))
+            cmds.select([
+                node.shortest_path()
+                for node in i__.node_index.ls(typ)
+            ])
     return select
 
 
@@ -2363,6 +2451,10 @@ def delete_physics_options(*args):
     return _Window("deleteAllPhysics", delete_physics)
 
 
+def convert_to_polygons_options(*args):
+    return _Window("convertToPolygons", convert_to_polygons)
+
+
 def import_physics_options(*args):
     win = None
 
@@ -5,6 +5,7 @@ import time
 import random
 import logging
 import functools
+import contextlib
 
 from maya import cmds
 from .vendor import cmdx
@@ -46,9 +47,30 @@ class UserAttributes(object):
         self._added = []
 
     def do_it(self):
-        if not self._added:
-            pass
+        self.do_many([self])
 
+    @classmethod
+    def do_many(cls, user_attributes):
+        """Add and connect attributes for many interfaces at once
+
+        Attributes are added for all of them, and then connected for
+        all of them, such that the modifier only commits once inbetween.
+
+        Arguments:
+            user_attributes (list): Of UserAttributes instances
+
+        """
+
+        with cmdx.DagModifier() as mod:
+            added = [uas._add_attributes(mod) for uas in user_attributes]
+
+            # New attributes must exist before being connected
+            mod.do_it()
+
+            for uas, attributes in zip(user_attributes, added):
+                uas._connect_attributes(mod, attributes)
+
+    def _add_attributes(self, mod):
         added = []
 
         while self._added:
@@ -56,36 +78,40 @@ class UserAttributes(object):
 
             if isinstance(attr, cmdx._AbstractAttribute):
                 name = attr["name"]
-
-                if self._target.has_attr(name):
-                    continue
-
-                with cmdx.DagModifier() as mod:
-                    mod.add_attr(self._target, attr)
-
-                plug = self._target[name]
+                source = None
 
             else:
                 attr, long_name, nice_name = attr
                 name = long_name or attr
+                source = attr
 
-                if self._target.has_attr(name):
-                    continue
+            if self._target.has_attr(name):
+                continue
 
-                plug = self.semi_proxy(attr, long_name, nice_name)
+            if any(name == other for other, _ in added):
+                continue
 
-            added += [plug]
+            if source is not None:
+                attr = self._semi_proxy_attribute(source, name, nice_name)
 
-        with cmdx.DagModifier() as mod:
-            for new_plug in added:
-                index = self._source["userAttributes"].next_available_index()
-                mod.connect(new_plug, self._source["userAttributes"][index])
+            mod.add_attr(self._target, attr)
+            added += [(name, source)]
+
+        return added
+
+    def _connect_attributes(self, mod, added):
+        # Allocate every index up-front, rather than
+        # waiting for each index to be occupied in turn
+        array = self._source["userAttributes"]
+        indices = array.next_available_indices(len(added), mod=mod)
 
-                # Can't figure out the next available index until the
-                # current index has been occupied. And we can't simply
-                # linearly increment the index either, as indices are
-                # logical, not physical.
-                mod.do_it()
+        for (name, source), index in zip(added, indices):
+            plug = self._target[name]
+
+            if source is not None:
+                mod.connect(plug, self._source[source])
+
+            mod.connect(plug, array[index])
 
     def proxy(self, attr, long_name=None, nice_name=None):
         """Create a proxy attribute for `name` on `target`"""
@@ -112,6 +138,17 @@ class UserAttributes(object):
         """
 
         name = long_name or attr
+        mattr = self._semi_proxy_attribute(attr, name, nice_name)
+
+        with cmdx.DagModifier() as mod:
+            mod.add_attr(self._target, mattr)
+            mod.do_it()
+            mod.connect(self._target[name], self._source[attr])
+
+        return self._target[name]
+
+    def _semi_proxy_attribute(self, attr, name, nice_name=None):
+        """Return a new attribute `name` mimicking `attr` of the source"""
         plug = self._source[attr]
 
         kwargs = {
@@ -151,14 +188,7 @@ class UserAttributes(object):
 
             return Plug(name, **kwargs)
 
-        mattr = make_plug(plug, kwargs)
-
-        with cmdx.DagModifier() as mod:
-            mod.add_attr(self._target, mattr)
-            mod.do_it()
-            mod.connect(self._target[name], self._source[attr])
-
-        return self._target[name]
+        return make_plug(plug, kwargs)
 
     def add(self, attr, long_name=None, nice_name=None):
         assert isinstance(attr, string_types), "%s was not a string" % attr
@@ -169,6 +199,91 @@ class UserAttributes(object):
         self._added.append(cmdx.Divider(label))
 
 
+class Snapshot(object):
+    """Transforms of many nodes, read once and up-front
+
+    Building physics reads from the very nodes it is busy changing,
+    which may trigger an evaluation of a half-built solver. Capture
+    what you need before building, and pass the snapshot along to each
+    command instead.
+
+    Values are looked up by (node, attribute), same as the dictionaries
+    previously passed as `_cache`. Anything not captured is read from
+    the scene on first access and counted as a miss.
+
+    """
+
+    Attributes = ("worldMatrix", "matrix", "translate", "rotate")
+
+    def __init__(self, nodes=None):
+        self._values = {}
+        self.hits = 0
+        self.misses = 0
+
+        if nodes:
+            self.capture(nodes)
+
+    def capture(self, nodes, attributes=None):
+        """Read `attributes` of each of `nodes` in one go"""
+        for node in nodes:
+            for attr in attributes or self.Attributes:
+                self._values[(node, attr)] = self._read(node, attr)
+
+    def transform(self, node):
+        """Return the world transformation of `node`"""
+        return cmdx.Tm(self[(node, "worldMatrix")])
+
+    def get(self, key, default=None):
+        try:
+            value = self._values[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        else:
+            self.hits += 1
+            return value
+
+    def __getitem__(self, key):
+        try:
+            value = self._values[key]
+        except KeyError:
+            self.misses += 1
+            value = self._read(*key)
+            self._values[key] = value
+        else:
+            self.hits += 1
+
+        return value
+
+    def __setitem__(self, key, value):
+        self._values[key] = value
+
+    def __contains__(self, key):
+        return key in self._values
+
+    def __repr__(self):
+        return "%s(%d values, %d hits, %d misses)" % (
+            type(self).__name__, len(self._values), self.hits, self.misses
+        )
+
+    def _read(self, node, attr):
+        if attr == "worldMatrix":
+            return node["worldMatrix"][0].asMatrix()
+
+        plug = node[attr]
+
+        if attr == "translate":
+            return plug.as_vector()
+
+        if attr == "rotate":
+            return plug.as_euler()
+
+        if attr.endswith("Matrix") or attr == "matrix":
+            return plug.asMatrix()
+
+        return plug.read()
+
+
 def with_contract(args=None, kwargs=None, returns=None):
     args = args or []
     kwargs = kwargs or {}
@@ -330,15 +445,97 @@ def sort_filenames(fnames, suffix=".rag"):
     ]
 
 
+class NameAllocator(object):
+    """Hand out unique node names
+
+    Existing names starting with a given prefix are listed once, on
+    first request of that prefix, after which names are handed out
+    without consulting Maya. Names handed out are remembered, such
+    that the next one is unique too even before a node is given it.
+
+    Only valid for as long as nodes aren't renamed or created
+    elsewhere, use :func:`unique_names` to share one for a batch.
+
+    """
+
+    def __init__(self):
+        self._taken = {}  # prefix -> {names}
+        self._next = {}   # prefix -> next index to try
+
+    def allocate(self, name):
+        try:
+            taken = self._taken[name]
+        except KeyError:
+            taken = set(
+                existing.rsplit("|", 1)[-1]
+                for existing in cmds.ls(name + "*") or []
+            )
+
+            self._taken[name] = taken
+
+        if name in taken:
+            index = self._next.get(name, 1)
+            while "%s%d" % (name, index) in taken:
+                index += 1
+
+            self._next[name] = index + 1
+            name = "%s%d" % (name, index)
+
+        # Other prefixes may need to know about it too,
+        # e.g. rRigid12 is taken from rRigid1 as well
+        for prefix, names in self._taken.items():
+            if name.startswith(prefix):
+                names.add(name)
+
+        return name
+
+
+_allocator = None
+
+
+@contextlib.contextmanager
+def unique_names():
+    """Share one NameAllocator with every unique_name() call within
+
+    Example:
+        with unique_names():
+            for transform in transforms:
+                name = unique_name("rRigid")
+
+    """
+
+    global _allocator
+
+    # Nested batches use the outer-most allocator
+    if _allocator is not None:
+        yield _allocator
+        return
+
+    _allocator = NameAllocator()
+
+    try:
+        yield _allocator
+    finally:
+        _allocator = None
+
+
+def with_unique_names(func):
+    """Allocate every unique_name() within `func` from one batch"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with unique_names():
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
 def unique_name(name):
     """Internal utility function"""
-    if cmdx.exists(name):
-        index = 1
-        while cmdx.exists("%s%d" % (name, index)):
-            index += 1
-        name = "%s%d" % (name, index)
+    if _allocator is not None:
+        return _allocator.allocate(name)
 
-    return name
+    # One listing, rather than one probe per existing index
+    return NameAllocator().allocate(name)
 
 
 def shape_name(transform_name):
@@ -396,3 +593,291 @@ def add_to_set(node, name, mod=None):
 
     collection.add(node)
     return collection
+
+
+class NodeIndex(object):
+    """Live record of every Ragdoll node in the scene
+
+    Kept up to date by Maya as nodes are created and deleted, including
+    via undo and redo, such that asking for e.g. all rigids doesn't
+    involve a full scene traversal.
+
+    The members of each scene are recorded too. Each indexed node
+    carries a callback of its own, such that whenever it is connected
+    or disconnected its scene is looked up again, on next use, along
+    with the nodes wired to it should its scene have changed. Work done
+    elsewhere in the scene is never made to wait on the index.
+
+    Opening or creating a new scene marks the index as stale, and it is
+    rebuilt once on first use thereafter; nodes added whilst a scene is
+    opening are not recorded one at a time.
+
+    Queries made whilst the index isn't installed, e.g. in mayapy,
+    fall back to looking at the scene directly.
+
+    """
+
+    Scene = "rdScene"
+
+    def __init__(self):
+        self._types = []
+        self._all = {}      # hex -> Node
+        self._nodes = {}    # type -> {hex: Node}
+        self._owners = {}   # hex -> scene hex
+        self._members = {}  # scene hex -> {hex: Node}
+        self._dirty = set()  # hex of nodes whose scene may have changed
+        self._callbacks = []
+        self._node_callbacks = {}  # hex -> callback id
+        self._stale = True
+
+    @property
+    def installed(self):
+        return bool(self._callbacks)
+
+    def install(self, types=None):
+        if self.installed:
+            return
+
+        om = cmdx.om
+
+        if types is None:
+            types = cmds.pluginInfo("ragdoll", query=True, dependNode=True)
+
+        self._types = list(types or [])
+
+        for typ in self._types:
+            self._callbacks += [
+                om.MDGMessage.addNodeAddedCallback(
+                    self._on_node_added, typ),
+                om.MDGMessage.addNodeRemovedCallback(
+                    self._on_node_removed, typ),
+            ]
+
+        for message in (om.MSceneMessage.kBeforeOpen,
+                        om.MSceneMessage.kBeforeNew):
+            self._callbacks += [
+                om.MSceneMessage.addCallback(message, self._on_stale)
+            ]
+
+        self._on_stale()
+
+    def uninstall(self):
+        for callback_id in self._callbacks:
+            cmdx.om.MMessage.removeCallback(callback_id)
+
+        self._callbacks[:] = []
+        self._on_stale()
+
+    def ls(self, type=None):
+        """Return Ragdoll nodes of `type`, or every Ragdoll node
+
+        Arguments:
+            type (str, list, optional): One or more Ragdoll node types
+
+        """
+
+        if isinstance(type, string_types):
+            type = [type]
+
+        if not self.installed:
+            types = type or cmds.pluginInfo(
+                "ragdoll", query=True, dependNode=True)
+            return cmdx.ls(type=types)
+
+        self._rebuild_if_stale()
+
+        nodes = []
+        for typ in (type or self._types):
+            nodes.extend(self._nodes.get(typ, {}).values())
+
+        return nodes
+
+    def scene(self, node):
+        """Return the rdScene `node` belongs to, or None"""
+        if not self.installed or node.type() == self.Scene:
+            return self._find_scene(node)
+
+        self._rebuild_if_stale()
+
+        if node.hex not in self._all:
+            return self._find_scene(node)
+
+        self._resolve()
+
+        try:
+            return self._all[self._owners[node.hex]]
+        except KeyError:
+            return None
+
+    def members(self, scene, type=None):
+        """Return nodes of `type` belonging to `scene`"""
+        if isinstance(type, string_types):
+            type = [type]
+
+        if not self.installed:
+            return [
+                node for node in self.ls(type)
+                if node.type() != self.Scene
+                and self._find_scene(node) == scene
+            ]
+
+        self._rebuild_if_stale()
+        self._resolve()
+
+        return [
+            node for node in self._members.get(scene.hex, {}).values()
+            if type is None or node.type() in type
+        ]
+
+    def _find_scene(self, node, _visited=None):
+        if node.type() == self.Scene:
+            return node
+
+        if "startState" in node:
+            scene = node["startState"].output(type=self.Scene)
+
+            if scene is not None:
+                return scene
+
+        # Multipliers, controls and forces only reach the scene
+        # by way of the rigids and constraints they are wired to
+        _visited = _visited or set()
+        _visited.add(node.hex)
+
+        for other in node.connections(type=["rdRigid", "rdConstraint"]):
+            if other.hex in _visited:
+                continue
+
+            scene = self._find_scene(other, _visited)
+
+            if scene is not None:
+                return scene
+
+        return None
+
+    def _resolve(self):
+        """Look up the scene of nodes whose connections have changed"""
+        queue = list(self._dirty)
+        self._dirty.clear()
+
+        while queue:
+            key = queue.pop()
+            node = self._all.get(key)
+
+            if node is None or node.type() == self.Scene:
+                continue
+
+            scene = self._find_scene(node)
+            owner = scene.hex if scene is not None else None
+            previous = self._owners.get(key)
+
+            if owner == previous:
+                continue
+
+            if previous is not None:
+                self._members.get(previous, {}).pop(key, None)
+                self._owners.pop(key)
+
+            if owner is not None:
+                self._owners[key] = owner
+                self._members.setdefault(owner, {})[key] = node
+
+            # Anything wired to this node may have followed it
+            for other in node.connections(type=self._types):
+                if other.hex in self._all:
+                    queue.append(other.hex)
+
+    def _rebuild_if_stale(self):
+        if not self._stale:
+            return
+
+        self._all = {}
+        self._nodes = {typ: {} for typ in self._types}
+        self._owners.clear()
+        self._members.clear()
+
+        for node in cmdx.ls(type=self._types):
+            self._all[node.hex] = node
+            self._nodes.setdefault(node.type(), {})[node.hex] = node
+            self._watch(node)
+
+        self._dirty = set(self._all)
+        self._stale = False
+
+    def _watch(self, node):
+        """Hear about connections to and from `node`"""
+        om = cmdx.om
+        self._node_callbacks[node.hex] = (
+            om.MNodeMessage.addAttributeChangedCallback(
+                node.object(), self._on_attribute_changed)
+        )
+
+    def _unwatch(self, key):
+        callback_id = self._node_callbacks.pop(key, None)
+
+        if callback_id is not None:
+            cmdx.om.MMessage.removeCallback(callback_id)
+
+    def _on_stale(self, clientData=None):
+        for key in list(self._node_callbacks):
+            self._unwatch(key)
+
+        self._all = {}
+        self._nodes = {}
+        self._owners.clear()
+        self._members.clear()
+        self._dirty.clear()
+        self._stale = True
+
+    def _on_node_added(self, mobj, clientData=None):
+        if self._stale:
+            return
+
+        node = cmdx.Node(mobj)
+        self._all[node.hex] = node
+        self._nodes.setdefault(node.type(), {})[node.hex] = node
+        self._dirty.add(node.hex)
+        self._watch(node)
+
+    def _on_node_removed(self, mobj, clientData=None):
+        if self._stale:
+            return
+
+        key = "%x" % cmdx.om.MObjectHandle(mobj).hashCode()
+        typ = cmdx.om.MFnDependencyNode(mobj).typeName
+
+        self._all.pop(key, None)
+        self._nodes.get(typ, {}).pop(key, None)
+        self._dirty.discard(key)
+        self._unwatch(key)
+
+        owner = self._owners.pop(key, None)
+        if owner is not None:
+            self._members.get(owner, {}).pop(key, None)
+
+        # Members of a deleted scene are left without one
+        for member in self._members.pop(key, {}):
+            self._owners.pop(member, None)
+            self._dirty.add(member)
+
+    def _on_attribute_changed(self, msg, plug, other, clientData=None):
+        om = cmdx.om
+        if not msg & (om.MNodeMessage.kConnectionMade |
+                      om.MNodeMessage.kConnectionBroken):
+            return
+
+        if self._stale:
+            return
+
+        for mplug in (plug, other):
+            if mplug.isNull:
+                continue
+
+            key = "%x" % om.MObjectHandle(mplug.node()).hashCode()
+
+            if key in self._all:
+                self._dirty.add(key)
+
+
+# One per Maya session, installed alongside the user interface
+node_index = NodeIndex()
@@ -0,0 +1,375 @@
+"""Timings of common operations
+
+These aren't tests and aren't picked up by nose, run them by hand.
+
+    from ragdoll.tests import benchmarks
+    benchmarks.manual()
+
+"""
+
+import time
+
+from maya import cmds
+
+from .. import commands, internal
+from ..tools import chain_tool
+from ..vendor import cmdx
+from . import _new
+
+
+def _make_joint_chain(count, length=2.0):
+    joints = []
+
+    with cmdx.DagModifier() as mod:
+        parent = None
+
+        for index in range(count):
+            joint = mod.create_node("joint", parent=parent)
+            mod.set_attr(joint["translateX"], length if parent else 0.0)
+            mod.set_attr(joint["rotateZ"], cmdx.radians(5))
+
+            parent = joint
+            joints += [joint]
+
+    return joints
+
+
+def bench_chain(count=50):
+    """Create a chain of `count` links"""
+    _new()
+
+    links = _make_joint_chain(count)
+    scene = commands.create_scene()
+
+    coalesced = cmdx.Stats.CoalescedWriteCount
+    flushed = cmdx.Stats.ReadFlushCount
+
+    t0 = time.time()
+    chain_tool.create(links, scene)
+    duration = time.time() - t0
+
+    print("bench_chain: %d links in %.2fms "
+          "(%d writes coalesced, %d flushed on read)" % (
+              count,
+              duration * 1000,
+              cmdx.Stats.CoalescedWriteCount - coalesced,
+              cmdx.Stats.ReadFlushCount - flushed))
+
+    return duration
+
+
+def bench_set_attr(count=10000):
+    """Write to `count` plugs, with and without modifier history"""
+    _new()
+
+    with cmdx.DGModifier() as mod:
+        nodes = [mod.create_node("transform") for _ in range(count // 10)]
+
+    plugs = [node[attr]
+             for node in nodes
+             for attr in ("tx", "ty", "tz", "rx", "ry", "rz",
+                          "sx", "sy", "sz", "v")]
+
+    durations = {}
+    for debug in (True, False):
+        t0 = time.time()
+
+        with cmdx.DGModifier(debug=debug) as mod:
+            for plug in plugs:
+                mod.set_attr(plug, 1.0)
+
+        durations[debug] = time.time() - t0
+
+    print("bench_set_attr: %d writes in %.2fms, %.2fms without history" % (
+        len(plugs), durations[True] * 1000, durations[False] * 1000))
+
+    return durations
+
+
+def bench_types(count=10000):
+    """Read and write the attribute types most commonly used by Ragdoll"""
+    _new()
+
+    node = cmdx.create_node("transform")
+    matrix = cmdx.Matrix4()
+
+    # (attribute, value) pairs
+    types = (
+        ("double", "translateX", 1.0),
+        ("double3", "translate", (1.0, 2.0, 3.0)),
+        ("matrix", "offsetParentMatrix", matrix),
+        ("enum", "rotateOrder", 1),
+        ("bool", "visibility", True),
+    )
+
+    for name, attr, value in types:
+        if attr not in node:
+            # E.g. offsetParentMatrix was introduced in Maya 2020
+            continue
+
+        plug = node[attr]
+
+        # Measure conversion only, these are never actually applied
+        mod = cmdx.om.MDGModifier()
+
+        t0 = time.time()
+        for _ in range(count):
+            cmdx._python_to_mod(value, plug, mod)
+        write = time.time() - t0
+
+        t0 = time.time()
+        for _ in range(count):
+            plug.read()
+        read = time.time() - t0
+
+        print("bench_types: %s, %d writes in %.2fms, reads in %.2fms" % (
+            name, count, write * 1000, read * 1000))
+
+
+def bench_hierarchy(count=10000):
+    """Query every joint of a `count`-joint hierarchy"""
+    _new()
+
+    # A few long chains, rather than one very deep one
+    roots = [_make_joint_chain(count // 10)[0] for _ in range(10)]
+
+    with cmdx.DagModifier() as mod:
+        top = mod.create_node("transform")
+
+        for root in roots:
+            mod.parent(root, top)
+
+    t0 = time.time()
+    before = list(top.descendents(type="joint"))
+    descendents = time.time() - t0
+
+    t0 = time.time()
+    after = top.hierarchy(type="joint", filter=cmdx.kJoint)
+    hierarchy = time.time() - t0
+
+    assert before == after
+
+    print("bench_hierarchy: %d joints, descendents() %.2fms, "
+          "hierarchy() %.2fms" % (
+              len(after), descendents * 1000, hierarchy * 1000))
+
+
+def bench_ls(count=20000):
+    """Find a handful of nodes amongst `count` others"""
+    _new()
+
+    with cmdx.DGModifier() as mod:
+        for _ in range(count):
+            mod.create_node("multMatrix")
+
+    scene = commands.create_scene()
+
+    t0 = time.time()
+    before = list(map(cmdx.encode, cmds.ls(type="rdScene")))
+    strings = time.time() - t0
+
+    t0 = time.time()
+    after = cmdx.ls(type="rdScene")
+    api = time.time() - t0
+
+    assert before == after == [scene]
+
+    print("bench_ls: %d nodes, via strings %.2fms, via API %.2fms" % (
+        count, strings * 1000, api * 1000))
+
+    assert api < strings, "Listing via API was slower than via strings"
+
+
+def bench_create_rigids(count=300):
+    """Create `count` rigids one at a time, and then all at once"""
+
+    def make_cubes():
+        _new()
+
+        cubes = []
+        for index in range(count):
+            cube, _ = map(cmdx.encode, cmds.polyCube())
+            cube["translateX"] = index * 2.0
+            cubes += [cube]
+
+        return cubes, commands.create_scene()
+
+    cubes, scene = make_cubes()
+
+    t0 = time.time()
+    for cube in cubes:
+        commands.create_rigid(cube, scene)
+    individual = time.time() - t0
+
+    cubes, scene = make_cubes()
+
+    t0 = time.time()
+    commands.create_rigids(cubes, scene)
+    batch = time.time() - t0
+
+    print("bench_create_rigids: %d rigids, create_rigid() %.2fms, "
+          "create_rigids() %.2fms" % (
+              count, individual * 1000, batch * 1000))
+
+
+def bench_unique_name(count=500):
+    """Name `count` new nodes, one at a time and as one batch"""
+    _new()
+
+    with cmdx.DGModifier() as mod:
+        for _ in range(count):
+            mod.create_node("network", name=internal.unique_name("rRigid"))
+
+    t0 = time.time()
+    for _ in range(count):
+        internal.unique_name("rRigid")
+    individual = time.time() - t0
+
+    t0 = time.time()
+    with internal.unique_names():
+        for _ in range(count):
+            internal.unique_name("rRigid")
+    batch = time.time() - t0
+
+    print("bench_unique_name: %d names amongst %d, individually %.2fms, "
+          "batched %.2fms" % (count, count, individual * 1000, batch * 1000))
+
+
+def bench_lean_rigids(count=100, frames=50):
+    """Evaluate `count` active rigids per frame, with and without helpers"""
+    durations = {}
+
+    for lean in (False, True):
+        _new()
+
+        cubes = []
+        for index in range(count):
+            cube, _ = map(cmdx.encode, cmds.polyCube())
+            cube["translate"] = (index * 2.0, 5.0 + index * 0.1, 0.0)
+            cubes += [cube]
+
+        scene = commands.create_scene()
+        commands.create_rigids(cubes, scene, opts={"lean": lean})
+
+        t0 = time.time()
+        for frame in range(1, frames + 1):
+            cmds.currentTime(frame)
+
+            for cube in cubes:
+                cube["worldMatrix"][0].read()  # Trigger evaluation
+
+        durations[lean] = time.time() - t0
+
+    print("bench_lean_rigids: %d rigids over %d frames, "
+          "%.2ffps with helpers, %.2ffps lean" % (
+              count, frames,
+              frames / durations[False], frames / durations[True]))
+
+
+def bench_bake(count=50, frames=100):
+    """Bake `count` rigids over `frames` frames"""
+    _new()
+
+    cubes = []
+    for index in range(count):
+        cube, _ = map(cmdx.encode, cmds.polyCube())
+        cube["translate"] = (index * 2.0, 5.0 + index * 0.1, 0.0)
+        cubes += [cube]
+
+    scene = commands.create_scene()
+    rigids = commands.create_rigids(cubes, scene)
+
+    t0 = time.time()
+    curves = commands.bake(rigids, start=1, end=frames)
+    duration = time.time() - t0
+
+    print("bench_bake: %d rigids over %d frames in %.2fms, "
+          "%.2ffps (%d curves)" % (
+              count, frames, duration * 1000,
+              frames / duration, len(curves)))
+
+
+def bench_delete_physics(count=100):
+    """Delete physics from a chain of `count` links"""
+    _new()
+
+    links = _make_joint_chain(count)
+    scene = commands.create_scene()
+    chain_tool.create(links, scene)
+
+    nodes = cmdx.ls(type=cmds.pluginInfo(
+        "ragdoll", query=True, dependNode=True))
+
+    t0 = time.time()
+    result = commands.delete_physics(nodes)
+    planned = time.time() - t0
+
+    # What delete_physics used to do, one commit per node
+    cmds.undo()
+    nodes = [node for node in nodes if node.exists]
+
+    t0 = time.time()
+    with cmdx.DagModifier() as mod:
+        for node in nodes:
+            if node.exists:
+                mod.delete(node)
+                mod.do_it()
+    individual = time.time() - t0
+
+    print("bench_delete_physics: %d nodes, one commit %.2fms, "
+          "one commit per node %.2fms" % (
+              result["deletedRagdollNodeCount"],
+              planned * 1000, individual * 1000))
+
+
+def bench_create_many_chains(count=20, links=5):
+    """Create `count` chains one at a time, and then all at once"""
+
+    def make_chains():
+        _new()
+        chains = []
+
+        for index in range(count):
+            chain = _make_joint_chain(links)
+            chain[0]["translateZ"] = index * 5.0
+            chains += [chain]
+
+        return chains, commands.create_scene()
+
+    chains, scene = make_chains()
+
+    t0 = time.time()
+    for chain in chains:
+        chain_tool.create(chain, scene)
+    individual = time.time() - t0
+
+    chains, scene = make_chains()
+
+    t0 = time.time()
+    chain_tool.create_many(chains, scene)
+    batch = time.time() - t0
+
+    print("bench_create_many_chains: %d chains, one at a time %.2fms, "
+          "all at once %.2fms" % (count, individual * 1000, batch * 1000))
+
+
+def manual():
+    import sys
+
+    mod = sys.modules[__name__]
+    benchmarks = list(
+        func
+        for name, func in sorted(mod.__dict__.items())
+        if name.startswith("bench_")
+    )
+
+    t0 = time.time()
+
+    for benchmark in benchmarks:
+        benchmark()
+
+    # Cleanup
+    _new()
+    t1 = time.time()
+
+    print("Ran %d benchmarks in %.2fs" % (len(benchmarks), t1 - t0))
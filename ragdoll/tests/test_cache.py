@@ -0,0 +1,97 @@
+import os
+
+from maya import cmds
+from .. import commands, cache
+from ..vendor import cmdx
+from . import _new, _save, _load
+
+from nose.tools import (
+    assert_equals,
+    assert_almost_equals,
+)
+
+
+def test_record_and_replay():
+    _new(1, 30)
+
+    cube, _ = map(cmdx.encode, cmds.polyCube())
+    cube["translateY"] = 10
+
+    scene = commands.create_scene()
+    commands.create_rigid(cube, scene)
+
+    path = cmds.file("test.rcache", expandName=True, query=True)
+    cache.record(scene, start=1, end=30, path=path)
+
+    cached = cache.Cache(path)
+    assert_equals(len(cached), 30)
+    assert_equals(len(cached.names), 1)
+
+    # Random access, without stepping through prior frames
+    resting = cached.matrices(30)[0]
+    assert_almost_equals(tuple(resting)[13], 0.5, 1)
+    cached.close()
+
+    curves = cache.attach(scene, path)
+    os.remove(path)
+
+    # The cache is keyed into the scene, and no longer needed
+    assert_equals(len(curves), 6)
+    assert not scene["enabled"].read(), "Solver should be disabled"
+
+    cmds.currentTime(30)
+    assert_almost_equals(cube["translateY"].read(), 0.5, 1)
+
+    cmds.currentTime(1)
+    assert_almost_equals(cube["translateY"].read(), 10.0, 1)
+
+    # Any frame may be evaluated, without changing time
+    with cmdx.DGContext(30, cmdx.UiUnit()):
+        assert_almost_equals(cube["translateY"].read(), 0.5, 1)
+
+    cache.detach(scene)
+
+    assert scene["enabled"].read(), "Solver should have been restored"
+    assert_equals(len(cmds.ls(type="animCurve")), 0)
+
+    # Attaching and detaching are both undoable
+    cmds.undo()
+    assert not scene["enabled"].read(), "Detach should have been undone"
+    assert_equals(len(cmds.ls(type="animCurve")), 6)
+
+    cmds.undo()
+    assert scene["enabled"].read(), "Attach should have been undone"
+    assert_equals(len(cmds.ls(type="animCurve")), 0)
+    assert "cachePath" not in scene, "Cache should have been forgotten"
+
+
+def test_playback_saved_with_scene():
+    _new(1, 30)
+
+    cube, _ = map(cmdx.encode, cmds.polyCube(name="cube"))
+    cube["translateY"] = 10
+
+    scene = commands.create_scene()
+    commands.create_rigid(cube, scene)
+
+    path = cmds.file("test.rcache", expandName=True, query=True)
+    cache.record(scene, start=1, end=30, path=path)
+    cache.attach(scene, path)
+    os.remove(path)
+
+    # Playback is part of the scene
+    _save()
+    _load()
+
+    scene = cmdx.ls(type="rdScene")[0]
+    cube = cmdx.encode("cube")
+
+    assert not scene["enabled"].read(), "Solver should be disabled"
+
+    cmds.currentTime(30)
+    assert_almost_equals(cube["translateY"].read(), 0.5, 1)
+
+    cache.detach(scene)
+
+    assert scene["enabled"].read(), "Solver should have been restored"
+    assert "cachePath" not in scene, "Cache should have been forgotten"
@@ -1,5 +1,5 @@
 from maya import cmds
-from .. import commands, constants
+from .. import commands, constants, internal
 from ..vendor import cmdx
 from ..tools import chain_tool
 from . import _play, _new
@@ -69,6 +69,442 @@ def test_delete_all():
     assert_equals(len(cmds.ls(type="rdRigid")), 0)
 
 
+def test_orient_many():
+    _new()
+
+    a = cmdx.createNode("transform")
+    b = cmdx.createNode("transform", parent=a)
+    c = cmdx.createNode("transform", parent=b)
+
+    b["translate"] = (5.0, 2.0, 0.0)
+    c["translate"] = (3.0, 0.0, 1.0)
+
+    scene = commands.create_scene()
+    ra = commands.create_passive_rigid(a, scene)
+    rb = commands.create_active_rigid(b, scene)
+    rc = commands.create_active_rigid(c, scene)
+
+    con1 = commands.socket_constraint(ra, rb)
+    con2 = commands.socket_constraint(rb, rc)
+
+    commands.orient(con1)
+    commands.orient(con2)
+
+    expected = [tuple(con["parentFrame"].asMatrix()) for con in (con1, con2)]
+
+    with cmdx.DagModifier() as mod:
+        for con in (con1, con2):
+            mod.set_attr(con["parentFrame"], cmdx.Mat4())
+
+    commands.orient_many([con1, con2])
+
+    for con, matrix in zip((con1, con2), expected):
+        for a, b in zip(con["parentFrame"].asMatrix(), matrix):
+            assert_almost_equals(a, b, 3)
+
+
+def test_quaternions_from_vectors():
+    a = [(1, 0, 0), (0, 2, 0), (1, 1, 0), (0, 0, 1)]
+    b = [(0, 1, 0), (0, 0, 3), (1, 1, 0), (0, 0, -1)]
+
+    quats = cmdx.quaternions_from_vectors(a, b)
+
+    for u, v, q in zip(a, b, quats):
+        u = cmdx.Vector(*u).normal()
+        v = cmdx.Vector(*v).normal()
+
+        # Rotates `u` onto `v`, also when they are opposite
+        rotated = u.rotateBy(cmdx.Quaternion(*q))
+
+        for x, y in zip(rotated, v):
+            assert_almost_equals(x, y, 5)
+
+
+def test_create_constraints():
+    _new()
+
+    a = cmdx.createNode("transform")
+    b = cmdx.createNode("transform", parent=a)
+    c = cmdx.createNode("transform", parent=b)
+
+    b["translate"] = (5.0, 2.0, 0.0)
+    c["translate"] = (3.0, 0.0, 1.0)
+
+    scene = commands.create_scene()
+    ra, rb, rc = commands.create_rigids([a, b, c], scene)
+
+    # One at a time..
+    expected = []
+    for parent, child in ((ra, rb), (rb, rc)):
+        con = commands.socket_constraint(parent, child)
+        commands.orient(con)
+        expected += [(tuple(con["parentFrame"].asMatrix()),
+                      tuple(con["childFrame"].asMatrix()))]
+
+    # ..and all at once
+    constraints = commands.create_constraints([(ra, rb), (rb, rc)])
+    assert_equals(len(constraints), 2)
+
+    for con, (parent_frame, child_frame) in zip(constraints, expected):
+        assert_equals(con["type"].read(), constants.SocketConstraint)
+        assert_equals(con["parentRigid"].connection().type(), "rdRigid")
+
+        for x, y in zip(con["parentFrame"].asMatrix(), parent_frame):
+            assert_almost_equals(x, y, 3)
+
+        for x, y in zip(con["childFrame"].asMatrix(), child_frame):
+            assert_almost_equals(x, y, 3)
+
+
+def test_create_rigids():
+    _new()
+
+    cubes = []
+    for index in range(3):
+        cube, _ = map(cmdx.encode, cmds.polyCube())
+        cube["translateX"] = index * 2.0
+        cubes += [cube]
+
+    scene = commands.create_scene()
+    rigids = commands.create_rigids(cubes, scene)
+
+    assert_equals([rigid.parent() for rigid in rigids], cubes)
+
+    # Each one got an index of its own
+    elements = set(
+        rigid["nextState"].connection(plug=True).path()
+        for rigid in rigids
+    )
+    assert_equals(len(elements), 3)
+
+    for cube in cubes:
+        assert "mass" in cube, "%s didn't get user attributes" % cube
+
+    cmds.undo()
+    assert_equals(len(cmds.ls(type="rdRigid")), 0)
+
+
+def test_lean_rigid():
+    _new()
+
+    cube, _ = map(cmdx.encode, cmds.polyCube())
+    cube["translateY"] = 10
+
+    scene = commands.create_scene()
+    rigid = commands.create_rigid(cube, scene, opts={"lean": True})
+
+    # Driven by the rigid directly, without a pairBlend inbetween
+    assert_equals(cube["translateY"].connection(), rigid)
+    assert_equals(len(cmds.ls(type="pairBlend")), 0)
+
+    _play(rigid, start=1, end=30)
+    assert_almost_equals(cube["translateY"].read(), 0.5, 1)
+
+
+def test_node_index():
+    _new()
+
+    index = internal.NodeIndex()
+    index.install()
+
+    try:
+        a = cmdx.createNode("transform")
+        b = cmdx.createNode("transform", parent=a)
+        b["ty"] = 5.0
+
+        scene = commands.create_scene()
+        ra = commands.create_rigid(a, scene)
+        rb = commands.create_rigid(b, scene)
+        con = commands.socket_constraint(ra, rb)
+
+        assert_equals(index.ls("rdScene"), [scene])
+        assert_equals(set(index.ls("rdRigid")), {ra, rb})
+        assert_equals(index.scene(con), scene)
+        assert_equals(set(index.members(scene, "rdRigid")), {ra, rb})
+
+        # Membership follows connections
+        other = commands.create_scene()
+        with cmdx.DGModifier() as mod:
+            mod.disconnect(ra["startState"])
+            mod.connect(ra["startState"], other["inputActiveStart"][0])
+
+        assert_equals(index.scene(ra), other)
+        assert_equals(index.members(other, "rdRigid"), [ra])
+        assert_equals(index.members(scene, "rdRigid"), [rb])
+
+        cmds.undo()  # reconnect
+        assert_equals(index.scene(ra), scene)
+
+        cmds.undo()  # create_scene
+        cmds.undo()  # socket_constraint
+        assert_equals(index.ls("rdConstraint"), [])
+
+        cmds.redo()
+        assert_equals(len(index.ls("rdConstraint")), 1)
+
+        # Rebuilt on first use after the scene changes
+        _new()
+        assert_equals(index.ls(), [])
+
+    finally:
+        index.uninstall()
+
+
+def test_infer_geometry():
+    _new()
+
+    a = cmdx.createNode("joint")
+    b = cmdx.createNode("joint", parent=a)
+    c = cmdx.createNode("joint", parent=b)
+
+    b["translateX"] = 4.0
+    c["translateX"] = 2.0
+
+    ga, gb, gc = commands.infer_geometries([a, b, c])
+    assert_almost_equals(ga.length, 4.0, 3)
+    assert_almost_equals(gb.length, 2.0, 3)
+
+    # Shared with children, so long as nothing has moved
+    geo = commands.infer_geometry(b, parent=a, children=False)
+    assert geo is ga, "Geometry was not reused"
+
+    b["translateX"] = 6.0
+    geo = commands.infer_geometry(b, parent=a, children=False)
+    assert geo is not ga, "Stale geometry was reused"
+
+
+def test_snapshot():
+    _new()
+
+    a = cmdx.createNode("transform")
+    b = cmdx.createNode("transform", parent=a)
+    a["ty"] = 5.0
+    b["tx"] = 2.0
+
+    snapshot = internal.Snapshot([a, b])
+    scene = commands.create_scene()
+    ra, rb = commands.create_rigids([a, b], scene, _cache=snapshot)
+    assert_equals(snapshot.misses, 0)
+    assert_equals(snapshot.hits, 2)
+
+    # Captured values are used, even if the scene has since changed
+    a["ty"] = 10.0
+    assert_almost_equals(snapshot.transform(a).translation().y, 5.0, 3)
+
+    # Anything else is read on demand
+    con = commands.socket_constraint(ra, rb)
+    commands.orient(con, _cache=snapshot)
+    assert snapshot.misses > 0, "Rest matrices should have been missed"
+
+
+def test_unique_name():
+    _new()
+
+    cmdx.createNode("transform", name="rTest")
+    cmdx.createNode("transform", name="rTest1")
+
+    assert_equals(internal.unique_name("rTest"), "rTest2")
+    assert_equals(internal.unique_name("rFree"), "rFree")
+
+    # Names are unique within a batch, before any node is given one
+    with internal.unique_names():
+        assert_equals(internal.unique_name("rTest"), "rTest2")
+        assert_equals(internal.unique_name("rTest"), "rTest3")
+        assert_equals(internal.unique_name("rFree"), "rFree")
+        assert_equals(internal.unique_name("rFree"), "rFree1")
+
+
+def test_normalise_shapes():
+    _new()
+
+    a = cmdx.createNode("transform")
+    b = cmdx.createNode("transform", parent=a)
+    c = cmdx.createNode("transform", parent=b)
+
+    scene = commands.create_scene()
+    rigids = commands.create_rigids([a, b, c], scene)
+
+    for rigid, radius in zip(rigids, (1.0, 10.0, 10.0)):
+        rigid["shapeRadius"] = radius
+
+    commands.normalise_shapes(a, max_delta=0.25)
+
+    # Each is relative its own parent, not the root
+    ra, rb, rc = rigids
+    assert_almost_equals(ra["shapeRadius"].read(), 1.0, 3)
+    assert_almost_equals(rb["shapeRadius"].read(), 1.25, 3)
+    assert_almost_equals(rc["shapeRadius"].read(), 1.5625, 3)
+
+
+def test_bake():
+    _new()
+
+    cube, _ = map(cmdx.encode, cmds.polyCube())
+    cube["translateY"] = 10
+
+    scene = commands.create_scene()
+    rigid = commands.create_rigid(cube, scene)
+
+    curves = commands.bake([rigid], start=1, end=30, tolerance=0.001)
+    assert_equals(len(curves), 6)
+
+    # Keys come back along with their curves
+    cmds.undo()
+    assert_equals(len(cmds.ls(type="animCurve")), 0)
+
+    cmds.redo()
+    count = cmds.keyframe(curves[1].name(), query=True, keyframeCount=True)
+    assert count > 2, "Keys were not redone"
+
+    # Simulation is gone, in favour of keyframes
+    commands.delete_physics([rigid])
+    assert_equals(cube["translateY"].connection(), curves[1])
+
+    cmds.currentTime(30)
+    assert_almost_equals(cube["translateY"].read(), 0.5, 1)
+
+    # Falling straight down, nothing happens along X
+    assert_equals(cmds.keyframe(curves[0].name(),
+                                query=True,
+                                keyframeCount=True), 2)
+
+
+def test_reduce_keys():
+    # Falling, like a rigid would
+    times = [cmdx.om.MTime(frame, cmdx.om.MTime.uiUnit())
+             for frame in range(100)]
+    values = [-0.5 * 0.01 * frame ** 2 for frame in range(100)]
+
+    keys, reduced = commands._reduce_keys(times, values, tolerance=0.1)
+    assert len(keys) < len(times), "Nothing was reduced"
+
+    # Every removed key is within tolerance of the reduced curve
+    frames = [key.value for key in keys]
+    for time, value in zip(times, values):
+        for index in range(len(frames) - 1):
+            if frames[index] <= time.value <= frames[index + 1]:
+                break
+
+        blend = ((time.value - frames[index]) /
+                 (frames[index + 1] - frames[index]))
+        expected = reduced[index] + (reduced[index + 1] -
+                                     reduced[index]) * blend
+
+        assert abs(value - expected) <= 0.1, (
+            "Frame %d was %.3f off" % (time.value, abs(value - expected))
+        )
+
+
+def test_transfer_rig():
+    _new()
+
+    root = cmdx.createNode("transform", name="root")
+    left = cmdx.createNode("transform", name="arm_L_", parent=root)
+    right = cmdx.createNode("transform", name="arm_R_", parent=root)
+    left["translate"] = (2.0, 5.0, 1.0)
+    right["translate"] = (2.0, 5.0, -1.0)
+
+    scene = commands.create_scene()
+    rroot, rleft, rright = commands.create_rigids([root, left, right], scene)
+    cleft, cright = commands.create_constraints([(rroot, rleft),
+                                                 (rroot, rright)])
+
+    rleft["shapeRadius"] = 3.0
+    cleft["parentFrame"] = cmdx.Tm(translate=(0, 0, 2),
+                                   rotate=(0.5, 0.25, 0.1)).asMatrix()
+
+    pairs = commands.transfer_rig(("_L_", "_R_"))
+    assert_equals(set(pairs), {(rleft, rright), (cleft, cright)})
+    assert_almost_equals(rright["shapeRadius"].read(), 3.0, 3)
+
+    mirrored = cmdx.Tm(cright["parentFrame"].asMatrix())
+    assert_almost_equals(mirrored.translation().z, -2.0, 3)
+    assert_almost_equals(mirrored.rotation().x, -0.5, 3)
+    assert_almost_equals(mirrored.rotation().y, -0.25, 3)
+    assert_almost_equals(mirrored.rotation().z, 0.1, 3)
+
+    # All in one go
+    cmds.undo()
+    assert_almost_equals(rright["shapeRadius"].read(), 1.0, 3)
+
+
+def test_combine_polygons():
+    _new()
+
+    cubes = []
+    for index in range(3):
+        cube, _ = map(cmdx.encode, cmds.polyCube())
+        cube["translateX"] = index * 2.0
+        cubes += [cube]
+
+    scene = commands.create_scene()
+    rigids = commands.create_rigids(cubes, scene)
+
+    mesh = commands.combine_polygons(rigids)
+    assert_equals(len(cmds.ls(type="mesh")), 4)  # 3 cubes, 1 combined
+    assert_equals(cmds.polyEvaluate(mesh.path(), face=True), 18)
+
+    offsets = [mesh["faceOffsets"][i].read() for i in range(3)]
+    assert_equals(offsets, [0, 6, 12])
+
+    # Colors are part of history, to survive the mesh being evaluated
+    history = cmds.listHistory(mesh.path())
+    assert cmds.ls(history, type="polyColorPerVertex"), (
+        "Colors were not in the history of %s" % mesh
+    )
+
+
+def test_combine_polygons_bake():
+    _new(1, 30)
+
+    cube, _ = map(cmdx.encode, cmds.polyCube())
+    cube["translateY"] = 10
+
+    scene = commands.create_scene()
+    rigid = commands.create_rigid(cube, scene)
+
+    mesh = commands.combine_polygons([rigid], bake=(1, 30))
+
+    history = cmds.listHistory(mesh.path())
+    assert cmds.ls(history, type="cacheFile"), (
+        "%s was not played back from a cache" % mesh
+    )
+
+    # Positions come from disk, with the simulation out of the picture
+    scene["enabled"] = False
+
+    cmds.currentTime(1)
+    bottom = cmds.exactWorldBoundingBox(mesh.path())[1]
+    assert_almost_equals(bottom, 9.5, 1)
+
+    cmds.currentTime(30)
+    bottom = cmds.exactWorldBoundingBox(mesh.path())[1]
+    assert_almost_equals(bottom, 0.0, 1)
+
+
+def test_set_scene_initial_state():
+    _new()
+
+    a, _ = map(cmdx.encode, cmds.polyCube())
+    b, _ = map(cmdx.encode, cmds.polyCube())
+    a["ty"] = {1: 0.0, 10: 5.0}
+    b["ty"] = 2.0
+
+    scene = commands.create_scene()
+    rigids = commands.create_rigids([a, b], scene, opts={"passive": True})
+
+    assert_equals(set(commands.set_scene_initial_state(scene, frame=10)),
+                  set(rigids))
+
+    # Taken from frame 10, whilst still on frame 1
+    assert_equals(cmds.currentTime(query=True), 1)
+    rest = rigids[0]["cachedRestMatrix"].asTm().translation()
+    assert_almost_equals(rest.y, 5.0, 3)
+
+    rest = rigids[1]["cachedRestMatrix"].asTm().translation()
+    assert_almost_equals(rest.y, 2.0, 3)
+
+
 def test_convert_constraint():
     pass
 
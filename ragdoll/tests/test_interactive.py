@@ -104,6 +104,23 @@ def test_create_rigid():
     assert_equals(len(cmds.ls(type="rdScene")), 1)
 
 
+def test_create_rigid_skips_invalid():
+    _new()
+
+    a, _ = cmds.polyCube()
+    b, _ = cmds.polyCube()
+    c, _ = cmds.polyCube()
+
+    cmds.select(b)
+    assert_true(interactive.create_active_rigid())
+
+    # The rigid of `b` shouldn't stop `a` and `c`
+    cmds.select([a, b, c])
+    assert_true(interactive.create_active_rigid())
+
+    assert_equals(len(cmds.ls(type="rdRigid")), 3)
+
+
 def test_undo1():
     _new()
 
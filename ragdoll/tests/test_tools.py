@@ -1,12 +1,14 @@
 import os
 from maya import cmds
 from .. import commands
-from ..tools import character_tool
+from ..tools import character_tool, chain_tool, muscle_tool
 from ..vendor import cmdx
 from . import _new, _play
 
 from nose.tools import (
+    assert_equals,
     assert_almost_equals,
+    assert_raises,
 )
 
 
@@ -74,6 +76,100 @@ def test_character():
         assert_almost_equals(result["tz"].read(), -8.44, 2)
 
 
+def test_create_many_chains():
+    _new()
+
+    chains = []
+    for offset in range(3):
+        links = []
+
+        with cmdx.DagModifier() as mod:
+            parent = None
+
+            for index in range(4):
+                joint = mod.create_node("joint", parent=parent)
+                mod.set_attr(joint["translate"],
+                             (2.0 if parent else offset * 5.0, 0, 0))
+                parent = joint
+                links += [joint]
+
+        chains += [links]
+
+    scene = commands.create_scene()
+    results = chain_tool.create_many(chains, scene)
+
+    assert_equals(len(results), 3)
+    assert_equals(len(cmds.ls(type="rdRigid")), 12)
+    assert_equals(len(cmds.ls(type="rdConstraint")), 9)
+
+    # All chains are undone together
+    cmds.undo()
+    assert_equals(len(cmds.ls(type="rdRigid")), 0)
+
+
+def test_create_many_chains_shared_root():
+    _new()
+
+    head = cmdx.createNode("joint", name="head")
+    chains = []
+
+    for offset in range(3):
+        strand = []
+        parent = head
+
+        for index in range(3):
+            joint = cmdx.createNode("joint", parent=parent)
+            joint["translate"] = (offset, 2.0, 0)
+            strand += [joint]
+            parent = joint
+
+        chains += [[head] + strand]
+
+    scene = commands.create_scene()
+    chain_tool.create_many(chains, scene)
+
+    # One root for all strands
+    assert_equals(len(cmds.ls(type="rdRigid")), 10)
+    assert_equals(len(cmds.ls(type="rdConstraint")), 9)
+
+    # Links may not be shared beyond the root
+    _new()
+
+    a = cmdx.createNode("joint")
+    b = cmdx.createNode("joint", parent=a)
+    c = cmdx.createNode("joint", parent=b)
+    scene = commands.create_scene()
+
+    assert_raises(AssertionError,
+                  chain_tool.create_many, [[a, b, c], [b, c]], scene)
+
+
+def test_create_many_muscles():
+    _new()
+
+    with cmdx.DagModifier() as mod:
+        upper = mod.create_node("transform", name="upper")
+        lower = mod.create_node("transform", name="lower")
+        mod.set_attr(lower["translateY"], -10)
+
+        anchors = []
+        for index in range(3):
+            a = mod.create_node("transform", parent=upper)
+            b = mod.create_node("transform", parent=lower)
+            mod.set_attr(a["translateX"], index)
+            mod.set_attr(b["translateX"], index)
+            anchors += [(a, b)]
+
+    scene = commands.create_scene()
+    muscles = muscle_tool.create_many(anchors, scene)
+    assert_equals(len(muscles), 3)
+
+    # One passive rigid per anchor parent, shared by every muscle
+    assert_equals(len(cmds.ls(type="rdRigid")), 5)
+    assert_equals(len(cmds.ls(type="rdConstraint")), 6)
+    assert_equals(len(cmds.sets("ragdollMuscles", query=True)), 3)
+
+
 def test_dynamic_control():
     pass
 
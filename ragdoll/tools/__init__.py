@@ -6,6 +6,8 @@ from . import (
 
 # Keep a consistent `tools` interface for scripters
 create_muscle = muscle_tool.create
+create_muscles = muscle_tool.create_many
 create_chain = chain_tool.create
+create_chains = chain_tool.create_many
 create_character = character_tool.create
 create_dynamic_control = chain_tool.create
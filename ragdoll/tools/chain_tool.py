@@ -14,9 +14,41 @@ figure out the constraint frames.
 
 """
 
+import time
+import logging
+
 from ..vendor import cmdx
 from .. import commands, constants as c, internal as i__
 
+log = logging.getLogger("ragdoll")
+
+
+def _resolve_options(opts=None, defaults=None):
+    """Fill in whatever `opts` and `defaults` leave out
+
+    Returns:
+        (opts, defaults): The dictionaries given, filled in
+
+    """
+
+    opts = opts or {}
+    opts["autoKey"] = opts.get("autoKey", False)
+    opts["drawShaded"] = opts.get("drawShaded", False)
+    opts["blendMethod"] = opts.get("blendMethod",
+                                   c.SteppedBlendMethod)
+    opts["computeMass"] = opts.get("computeMass", False)
+    opts["autoMultiplier"] = opts.get("autoMultiplier", True)
+    opts["passiveRoot"] = opts.get("passiveRoot", True)
+    opts["autoLimits"] = opts.get("autoLimits", False)
+    opts["addUserAttributes"] = opts.get("addUserAttributes", True)
+
+    defaults = defaults or {}
+    defaults["shapeType"] = defaults.get(
+        "shapeType", c.CapsuleShape
+    )
+
+    return opts, defaults
+
 
 class Chain(object):
     """Create and manipulate a series of connected rigid bodies
@@ -26,25 +58,13 @@ class Chain(object):
 
     """
 
-    def __init__(self, links, scene, opts=None, defaults=None):
+    def __init__(self, links, scene, opts=None, defaults=None,
+                 _cache=None, _resolved=False):
         assert isinstance(links, (list, tuple)), "links was not a list"
         assert links, "links was empty"
 
-        opts = opts or {}
-        opts["autoKey"] = opts.get("autoKey", False)
-        opts["drawShaded"] = opts.get("drawShaded", False)
-        opts["blendMethod"] = opts.get("blendMethod",
-                                       c.SteppedBlendMethod)
-        opts["computeMass"] = opts.get("computeMass", False)
-        opts["autoMultiplier"] = opts.get("autoMultiplier", True)
-        opts["passiveRoot"] = opts.get("passiveRoot", True)
-        opts["autoLimits"] = opts.get("autoLimits", False)
-        opts["addUserAttributes"] = opts.get("addUserAttributes", True)
-
-        defaults = defaults or {}
-        defaults["shapeType"] = defaults.get(
-            "shapeType", c.CapsuleShape
-        )
+        if not _resolved:
+            opts, defaults = _resolve_options(opts, defaults)
 
         self._new_rigids = []
         self._new_constraints = []
@@ -52,8 +72,10 @@ class Chain(object):
         self._new_multipliers = []
 
         self._scene = scene
-        self._defaults = defaults
-        self._cache = {}
+
+        # Refined per link during planning, see _plan
+        self._defaults = dict(defaults)
+        self._cache = _cache if _cache is not None else i__.Snapshot()
         self._opts = opts
         self._pre_flighted = False
 
@@ -165,11 +187,7 @@ class Chain(object):
                 #                  \ /
                 #                   `
                 if not valid:
-                    is_child = False
-                    for child in transform.descendents():
-                        if child == expected_parent:
-                            is_child = True
-                            break
+                    is_child = expected_parent in transform.hierarchy()
 
                     # It's valid if the Maya parent isn't a Ragdoll child
                     valid = not is_child
@@ -184,16 +202,10 @@ class Chain(object):
 
         def pre_cache():
             """Pre-cache attributes to avoid needless evaluation"""
-            for transform, _ in self._pairs:
-                world_matrix = transform["worldMatrix"][0].asMatrix()
-                matrix = transform["matrix"].asMatrix()
-                translate = transform["translate"].as_vector()
-                rotate = transform["rotate"].as_euler()
-
-                self._cache[(transform, "worldMatrix")] = world_matrix
-                self._cache[(transform, "matrix")] = matrix
-                self._cache[(transform, "translate")] = translate
-                self._cache[(transform, "rotate")] = rotate
+            self._cache.capture(
+                transform for transform, _ in self._pairs
+                if (transform, "worldMatrix") not in self._cache
+            )
 
         def remember_existing_inputs():
             # Remember existing animation
@@ -243,6 +255,7 @@ class Chain(object):
 
         return transform, shape
 
+    @i__.with_unique_names
     def do_it(self):
         self._new_rigids[:] = []
         self._new_constraints[:] = []
@@ -263,99 +276,113 @@ class Chain(object):
         )
 
     def _do_all(self):
-        tree_root_transform, tree_root_shape = self._tree_root
-        tree_root_rigid = tree_root_transform.shape(type="rdRigid")
+        with cmdx.DagModifier() as mod:
+            self._make_tree_root(mod)
+
+        root_rigid = self._find_root_rigid()
+        plan = self._plan()
+
+        # Shapes are written both on creation and from the plan,
+        # only the last write needs to reach Maya
+        with cmdx.DagModifier(coalesce=True) as mod:
+            rigids = self._make_links(mod, plan)
+
+        # `shapeLength` is used during constraint creation to figure
+        # out draw scale, hence constraints come once rigids are done
+        pairs = list(zip([root_rigid] + rigids[:-1], rigids))
+        constraints = commands.create_constraints(
+            pairs,
+            aims=[link["aim"] for link in plan],
+            ups=[link["up"] for link in plan],
+            _cache=self._cache
+        )
 
-        # Root
-        if not tree_root_rigid:
-            with cmdx.DagModifier() as mod:
-                tree_root_rigid = self._make_root(mod,
-                                                  tree_root_transform,
-                                                  tree_root_shape)
+        with cmdx.DagModifier() as mod:
+            self._setup_constraints(mod, plan, pairs, constraints)
+
+        with cmdx.DGModifier() as dgmod:
+            self._finish(dgmod)
+
+        if self._opts["addUserAttributes"]:
+            i__.UserAttributes.do_many(self._new_userattrs)
+
+    def _make_tree_root(self, mod):
+        """Create a rigid for the root of the tree, unless there is one"""
+        transform, shape = self._tree_root
+
+        if not transform.shape(type="rdRigid"):
+            self._make_root(mod, transform, shape)
+
+    def _find_root_rigid(self):
+        """Return rigid of the first link, once the tree root exists"""
+        tree_root_transform, _ = self._tree_root
+        tree_root_rigid = tree_root_transform.shape(type="rdRigid")
 
         self._make_simulated_attr(tree_root_rigid, tree_root_transform)
 
         # Links
-        root_transform, root_shape = self._root
+        root_transform, _ = self._root
         root_rigid = root_transform.shape(type="rdRigid")
 
         # Always start off with the root
         self._new_rigids.append(root_rigid)
 
-        with cmdx.DagModifier() as mod:
-            previous_rigid = root_rigid
-            for transform, shape in self._pairs[1:]:
-                previous_rigid = self._do_one(mod,
-                                              transform,
-                                              shape,
-                                              previous_rigid)
-
-        with cmdx.DGModifier() as dgmod:
-            self._auto_blend(dgmod)
-
-            if self._opts["autoMultiplier"]:
-                self._auto_multiplier(dgmod)
-
-        if self._opts["addUserAttributes"]:
-            for userattr in self._new_userattrs:
-                userattr.do_it()
-
-    def _do_one(self, mod, transform, shape, previous_rigid):
-        assert transform and transform.isA(cmdx.kTransform), transform
-        assert shape is None or shape.isA(cmdx.kShape), shape
-        assert previous_rigid and previous_rigid.type() == "rdRigid"
+        return root_rigid
 
-        rigid = transform.shape(type="rdRigid")
+    def _finish(self, dgmod):
+        """Blend new rigids with animation, and multiply constraints"""
+        self._auto_blend(dgmod)
 
-        # Handle branching
-        #
-        #  o
-        #   \          o
-        #    \        /
-        #     o------o
-        #     |       \
-        #     |        o---o
-        #     o
-        #
-        if rigid is not None:
-            rigid = commands.convert_rigid(rigid, passive=False)
+        if self._opts["autoMultiplier"]:
+            self._auto_multiplier(dgmod)
 
-        else:
-            rigid = self._make_rigid(mod, transform, shape)
+    def _plan(self):
+        """Figure out everything about each link, before creating any of it
 
-            # Add header to newly created rigid
-            transform_attrs = i__.UserAttributes(rigid, transform)
-            transform_attrs.add_divider("Ragdoll")
-            transform_attrs.add("mass")
+        Returns:
+            plan (list): One dictionary per link, in order
 
-            self._new_userattrs += [transform_attrs]
+        """
 
-        # Figure out hierarchy
-        #
-        #               |
-        #               v
-        #     o---------o---------o
-        # previous            subsequent
-        #
-        #
-        index = self._children.index(transform)
+        plan = []
+        links = []
         count = len(self._children)
-        previous = self._children[index - 1] if index > 0 else self._root[0]
-        subsequent = self._children[index + 1] if index < count - 1 else None
+        defaults = dict(self._defaults)
+
+        for index, (transform, shape) in enumerate(self._pairs[1:]):
+            assert transform and transform.isA(cmdx.kTransform), transform
+            assert shape is None or shape.isA(cmdx.kShape), shape
+
+            # Figure out hierarchy
+            #
+            #               |
+            #               v
+            #     o---------o---------o
+            # previous            subsequent
+            #
+            #
+            previous = (
+                self._children[index - 1] if index > 0 else self._root[0]
+            )
+            subsequent = (
+                self._children[index + 1] if index < count - 1 else None
+            )
 
-        # Joints are special.
-        #
-        # The user expects it to face in the direction
-        # of its immediate joint transform, if any, even
-        # if the actual axis is all messed up.
-        #
-        # o     o<>----o
-        #  \   /
-        #   \ /
-        #    o
-        #
-        if not subsequent and transform.type() == "joint":
-            subsequent = transform.child(type="joint")
+            # Joints are special.
+            #
+            # The user expects it to face in the direction
+            # of its immediate joint transform, if any, even
+            # if the actual axis is all messed up.
+            #
+            # o     o<>----o
+            #  \   /
+            #   \ /
+            #    o
+            #
+            if not subsequent and transform.type() == "joint":
+                subsequent = transform.child(type="joint")
+
+            links += [(transform, shape, previous, subsequent)]
 
         # Transfer geometry into rigid, if any
         #
@@ -369,70 +396,115 @@ class Chain(object):
         #  |___\|/               |____|/
         #
         #
-        geo = commands.infer_geometry(
-            transform,
-            parent=previous or self._root[0],
-            children=[subsequent] if subsequent else False
+        geometries = commands.infer_geometries(
+            [transform for transform, _, _, _ in links],
+            parents=[previous or self._root[0]
+                     for _, _, previous, _ in links],
+            children=[[subsequent] if subsequent else False
+                      for _, _, _, subsequent in links],
+            _cache=self._cache
         )
 
-        mod.set_attr(rigid["shapeExtents"], geo.extents)
-        mod.set_attr(rigid["shapeLength"], geo.length)
-        mod.set_attr(rigid["shapeRadius"], geo.radius)
-        mod.set_attr(rigid["shapeRotation"], geo.shape_rotation)
-        mod.set_attr(rigid["shapeOffset"], geo.shape_offset)
+        for (transform, shape, previous, subsequent), geo in zip(
+                links, geometries):
+            if geo.length == 0:
+                defaults["shapeType"] = c.SphereShape
+
+            plan += [{
+                "transform": transform,
+                "shape": shape,
+                "geometry": geo,
+                "defaults": dict(defaults),
+                "aim": (self._cache.transform(subsequent).translation()
+                        if subsequent else None),
+                "up": (self._cache.transform(previous).translation()
+                       if previous else None),
+            }]
+
+        self._defaults.update(defaults)
+
+        return plan
+
+    def _make_links(self, mod, plan):
+        """Create a rigid per link of `plan`, returns the rigids"""
+        rigids = []
+
+        for link in plan:
+            transform = link["transform"]
+            rigid = transform.shape(type="rdRigid")
+
+            # Handle branching
+            #
+            #  o
+            #   \          o
+            #    \        /
+            #     o------o
+            #     |       \
+            #     |        o---o
+            #     o
+            #
+            if rigid is not None:
+                rigid = commands.convert_rigid(rigid, passive=False)
 
-        if geo.length == 0:
-            self._defaults["shapeType"] = c.SphereShape
+            else:
+                rigid = self._make_rigid(mod, transform, link["shape"])
 
-        # `shapeLength` is used during constraint creation,
-        # to figure out draw scale
-        mod.do_it()
+                # Add header to newly created rigid
+                transform_attrs = i__.UserAttributes(rigid, transform)
+                transform_attrs.add_divider("Ragdoll")
+                transform_attrs.add("mass")
 
-        con = commands.socket_constraint(previous_rigid, rigid)
+                self._new_userattrs += [transform_attrs]
 
-        # Rigids will overlap per default
-        mod.set_attr(con["disableCollision"], True)
+            geo = link["geometry"]
+            mod.set_attr(rigid["shapeExtents"], geo.extents)
+            mod.set_attr(rigid["shapeLength"], geo.length)
+            mod.set_attr(rigid["shapeRadius"], geo.radius)
+            mod.set_attr(rigid["shapeRotation"], geo.shape_rotation)
+            mod.set_attr(rigid["shapeOffset"], geo.shape_offset)
 
-        if self._opts["autoLimits"]:
-            fourtyfive = cmdx.radians(45)
-            mod.set_attr(con["angularLimitX"], fourtyfive)
-            mod.set_attr(con["angularLimitY"], fourtyfive)
-            mod.set_attr(con["angularLimitZ"], fourtyfive)
-        else:
-            mod.set_attr(con["angularLimitX"], 0)
-            mod.set_attr(con["angularLimitY"], 0)
-            mod.set_attr(con["angularLimitZ"], 0)
+            for key, value in link["defaults"].items():
+                mod.set_attr(rigid[key], value)
 
-        aim = None
-        up = None
+            rigids += [rigid]
 
-        if subsequent:
-            aim = subsequent.translation(cmdx.sWorld)
+        self._new_rigids += rigids
 
-        if previous:
-            up = previous.translation(cmdx.sWorld)
+        return rigids
 
-        commands.orient(con, aim=aim, up=up)
+    def _setup_constraints(self, mod, plan, pairs, constraints):
+        """Configure `constraints` made for each (parent, rigid) pair"""
 
-        # Let the user manually add these, if needed
-        mod.set_attr(con["driveStrength"], 0.5)
+        if self._opts["autoLimits"]:
+            limit = cmdx.radians(45)
+        else:
+            limit = 0
 
-        # Record hierarchical relationship, for articulations
-        mod.connect(previous_rigid["ragdollId"], rigid["parentRigid"])
+        for link, (parent, rigid), con in zip(plan, pairs, constraints):
 
-        for key, value in self._defaults.items():
-            mod.set_attr(rigid[key], value)
+            # Rigids will overlap per default
+            mod.set_attr(con["disableCollision"], True)
 
-        # Forward some convenience attributes
-        constraint_attrs = i__.UserAttributes(con, transform)
-        constraint_attrs.add("angularDriveStiffness", nice_name="Stiffness")
-        constraint_attrs.add("angularDriveDamping", nice_name="Damping")
+            mod.set_attr(con["angularLimitX"], limit)
+            mod.set_attr(con["angularLimitY"], limit)
+            mod.set_attr(con["angularLimitZ"], limit)
 
-        self._new_rigids += [rigid]
-        self._new_constraints += [con]
-        self._new_userattrs += [constraint_attrs]
+            # Let the user manually add these, if needed
+            mod.set_attr(con["driveStrength"], 0.5)
 
-        return rigid
+            # Record hierarchical relationship, for articulations
+            mod.connect(parent["ragdollId"], rigid["parentRigid"])
+
+            # Forward some convenience attributes
+            constraint_attrs = i__.UserAttributes(con, link["transform"])
+            constraint_attrs.add("angularDriveStiffness",
+                                 nice_name="Stiffness")
+            constraint_attrs.add("angularDriveDamping",
+                                 nice_name="Damping")
+
+            self._new_userattrs += [constraint_attrs]
+
+        self._new_constraints += constraints
 
     def _add_pairblend(self, dgmod, rigid, transform):
         """Put a pairBlend between `rigid` and `transform`
@@ -701,8 +773,8 @@ class Chain(object):
         for key, value in self._defaults.items():
             mod.set_attr(root_rigid[key], value)
 
-        geo = commands.infer_geometry(
-            transform, parent=None, children=[self._children[0]])
+        geo, = commands.infer_geometries(
+            [transform], children=[[self._children[0]]], _cache=self._cache)
 
         mod.set_attr(root_rigid["shapeLength"], geo.length)
         mod.set_attr(root_rigid["shapeRadius"], geo.radius)
@@ -756,3 +828,146 @@ class Chain(object):
 @i__.with_undo_chunk
 def create(links, scene, opts=None, defaults=None):
     return Chain(links, scene, opts, defaults).do_it()
+
+
+@i__.with_undo_chunk
+@i__.with_unique_names
+def create_many(chains, scene, opts=None, defaults=None):
+    """Create many chains at once, e.g. one tail per character of a crowd
+
+    Options and defaults are resolved once and shared by every chain.
+    The transforms of every link of every chain are read in one go and
+    every chain is planned before any is created. Rigids of all chains
+    are then created by one modifier, and their constraints by one call
+    to :func:`commands.create_constraints`.
+
+    Chains may share their first link, such as strands of hair off of
+    one head, but no other links. To branch off of another chain,
+    create that chain first.
+
+    Arguments:
+        chains (list): Of links, as passed to :func:`create`
+        scene (rdScene): Add every chain to this scene
+        opts (dict, optional): Same as :func:`create`, shared by all
+        defaults (dict, optional): Same as :func:`create`, shared by all
+
+    Returns:
+        nodes (list): Of created nodes, one list per chain
+
+    """
+
+    assert isinstance(chains, (list, tuple)), "chains was not a list"
+
+    t0 = time.time()
+    opts, defaults = _resolve_options(dict(opts or {}),
+                                      dict(defaults or {}))
+    cache = i__.Snapshot()
+
+    operators = [
+        Chain(links, scene, opts, defaults, _cache=cache, _resolved=True)
+        for links in chains
+    ]
+
+    # Links are created all at once, so no chain may
+    # depend on a link of another chain already existing
+    links = set()
+    for operator in operators:
+        for transform, _ in operator._pairs[1:]:
+            assert transform.hex not in links, (
+                "%s was part of more than one chain" % transform
+            )
+            links.add(transform.hex)
+
+    for operator in operators:
+        transform, _ = operator._pairs[0]
+        assert transform.hex not in links, (
+            "%s was both the root of one chain and a link of another" % (
+                transform)
+        )
+
+    cache.capture(
+        transform
+        for operator in operators
+        for transform, _ in operator._pairs
+    )
+
+    for operator in operators:
+        operator.pre_flight()
+        operator._pre_flighted = True
+
+    # Roots, once per tree
+    roots = set()
+    with cmdx.DagModifier() as mod:
+        for operator in operators:
+            transform, _ = operator._tree_root
+
+            if transform.hex not in roots:
+                roots.add(transform.hex)
+                operator._make_tree_root(mod)
+
+    root_rigids = [operator._find_root_rigid() for operator in operators]
+
+    plans = []
+    for index, operator in enumerate(operators):
+        t1 = time.time()
+        plans += [operator._plan()]
+
+        log.debug("Planned chain %d/%d with %d links in %.2fms" % (
+            index + 1, len(operators),
+            len(operator._pairs), (time.time() - t1) * 1000))
+
+    t1 = time.time()
+
+    # Shapes are written both on creation and from the plan,
+    # only the last write needs to reach Maya
+    with cmdx.DagModifier(coalesce=True) as mod:
+        rigids = [
+            operator._make_links(mod, plan)
+            for operator, plan in zip(operators, plans)
+        ]
+
+    pairs = [
+        list(zip([root_rigid] + chain_rigids[:-1], chain_rigids))
+        for root_rigid, chain_rigids in zip(root_rigids, rigids)
+    ]
+
+    constraints = commands.create_constraints(
+        [pair for chain_pairs in pairs for pair in chain_pairs],
+        aims=[link["aim"] for plan in plans for link in plan],
+        ups=[link["up"] for plan in plans for link in plan],
+        _cache=cache
+    )
+
+    with cmdx.DagModifier() as mod:
+        offset = 0
+
+        for operator, plan, chain_pairs in zip(operators, plans, pairs):
+            count = len(chain_pairs)
+            operator._setup_constraints(
+                mod, plan, chain_pairs, constraints[offset:offset + count]
+            )
+            offset += count
+
+    log.debug("Created %d rigids and constraints in %.2fms" % (
+        len(constraints), (time.time() - t1) * 1000))
+
+    with cmdx.DGModifier() as dgmod:
+        for operator in operators:
+            operator._finish(dgmod)
+
+    if opts["addUserAttributes"]:
+        i__.UserAttributes.do_many([
+            userattr
+            for operator in operators
+            for userattr in operator._new_userattrs
+        ])
+
+    log.info("Created %d chains in %.2fms" % (
+        len(operators), (time.time() - t0) * 1000))
+
+    return [
+        operator._new_rigids +
+        operator._new_constraints +
+        operator._new_multipliers
+        for operator in operators
+    ]
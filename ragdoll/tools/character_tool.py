@@ -191,76 +191,116 @@ def create(root,
     if not copy:
         control = False
 
-    # Protect against duplicate rigid-making
-    self = create
-    self.done = []
+    result = root
+
+    if copy:
+        result = cmds.duplicate(result.path(), returnRootsOnly=True)[0]
+        result = cmdx.encode(result)
+
+    # Classify the whole skeleton up-front, into (joint, label, parent)
+    # where parent is the index of the parent link, if any
+    links = []
+    visited = set()
+    stack = [(result, None)]
 
-    # Recursively make rigids and add constraints to `root`
-    def _recurse(child, parent=None):
-        if child in self.done:
-            return
+    while stack:
+        child, parent = stack.pop()
+
+        # Protect against duplicate rigid-making
+        if child.hex in visited:
+            continue
 
         # Ignore tip-joints
         if not child.child(type="joint"):
-            return
+            continue
 
-        label = child["type"]
+        label = child["type"].read()
 
         if label == Other:
             label = child["otherType"].read().lower()
 
         if exclusive and label == Stop:
-            return
+            continue
 
         if label == Skip:
             child = child.child(type="joint")
-            rigid = parent
+            index = parent
 
         else:
-            rigid = commands.create_rigid(child, scene)
-
-            if parent is not None:
-                if label in (Knee, Elbow, Finger):
-                    constraint = commands.hinge_constraint(parent, rigid)
-                    commands.orient(constraint)
-                    commands.reorient(constraint)
-
-                    with cmdx.DagModifier() as mod:
-                        mod.set_attr(constraint["driveEnabled"], True)
-                        mod.set_attr(constraint["driveStrength"], 1)
-                        mod.set_attr(constraint["linearDriveStiffness"], 0)
-                        mod.set_attr(constraint["linearDriveDamping"], 0)
-
-                else:
-                    constraint = commands.socket_constraint(parent, rigid)
-                    commands.orient(constraint)
-
-                constraint["disableCollision"] = True
-
-                # Make boxes out of these
-                if label in (Hand, Foot, Toe, Head):
-                    with cmdx.DagModifier() as mod:
-                        mod.set_attr(rigid["shapeType"], c.BoxShape)
+            index = len(links)
+            links += [(child, label, parent)]
 
-                # Tag as parent for articulations
-                with cmdx.DagModifier() as mod:
-                    mod.connect(parent["ragdollId"], rigid["parentRigid"])
-
-        self.done += [child]
+        visited.add(child.hex)
 
         if inclusive and label == Stop:
-            return
+            continue
 
-        for gc in child.children(type="joint"):
-            _recurse(gc, rigid)
+        # Reversed, such that the first child is visited first
+        for gc in reversed(list(child.children(type="joint"))):
+            stack.append((gc, index))
 
-    result = root
+    # Then create everything in bulk
+    rigids = commands.create_rigids([joint for joint, _, _ in links], scene)
+    cache = i__.Snapshot()
 
-    if copy:
-        result = cmds.duplicate(result.path(), returnRootsOnly=True)[0]
-        result = cmdx.encode(result)
+    hinges = []
+    sockets = []
+
+    for rigid, (joint, label, parent) in zip(rigids, links):
+        if parent is None:
+            continue
 
-    _recurse(result)
+        if label in (Knee, Elbow, Finger):
+            hinges += [(rigids[parent], rigid)]
+        else:
+            sockets += [(rigids[parent], rigid)]
+
+    hinge_constraints = commands.create_constraints(
+        hinges, type=c.HingeConstraint, _cache=cache
+    ) if hinges else []
+
+    socket_constraints = commands.create_constraints(
+        sockets, type=c.SocketConstraint, _cache=cache
+    ) if sockets else []
+
+    # Same as reorient(), twist along X and bend along Z
+    rotation = cmdx.Quat(cmdx.radians(-90), cmdx.Vector(0, 0, 1))
+    rotation *= cmdx.Quat(cmdx.radians(90), cmdx.Vector(1, 0, 0))
+    rotation = [tuple(cmdx.Tm(rotate=rotation).asMatrix())]
+    rotation *= len(hinge_constraints)
+
+    parent_frames = cmdx.multiply_matrices(rotation, [
+        tuple(con["parentFrame"].asMatrix()) for con in hinge_constraints
+    ])
+    child_frames = cmdx.multiply_matrices(rotation, [
+        tuple(con["childFrame"].asMatrix()) for con in hinge_constraints
+    ])
+
+    with cmdx.DagModifier() as mod:
+        for con, parent_frame, child_frame in zip(hinge_constraints,
+                                                  parent_frames,
+                                                  child_frames):
+            mod.set_attr(con["parentFrame"], cmdx.Mat4(parent_frame))
+            mod.set_attr(con["childFrame"], cmdx.Mat4(child_frame))
+
+            mod.set_attr(con["driveEnabled"], True)
+            mod.set_attr(con["driveStrength"], 1)
+            mod.set_attr(con["linearDriveStiffness"], 0)
+            mod.set_attr(con["linearDriveDamping"], 0)
+
+        for con in hinge_constraints + socket_constraints:
+            mod.set_attr(con["disableCollision"], True)
+
+        for rigid, (joint, label, parent) in zip(rigids, links):
+            if parent is None:
+                continue
+
+            # Make boxes out of these
+            if label in (Hand, Foot, Toe, Head):
+                mod.set_attr(rigid["shapeType"], c.BoxShape)
+
+            # Tag as parent for articulations
+            mod.connect(rigids[parent]["ragdollId"], rigid["parentRigid"])
 
     if control:
         rigid = result.shape(type="rdRigid")
@@ -281,27 +321,32 @@ def create(root,
         root_proxies.add("kinematic")
         root_proxies.do_it()
 
-        with cmdx.DagModifier() as mod:
-            for reference, joint in zip(root.descendents(type="joint"),
-                                        result.descendents(type="joint")):
+        pairs = []
+        for reference, joint in zip(
+                root.hierarchy(type="joint", filter=cmdx.kJoint),
+                result.hierarchy(type="joint", filter=cmdx.kJoint)):
+
+            rigid = joint.shape(type="rdRigid")
 
-                rigid = joint.shape(type="rdRigid")
+            if rigid is not None:
+                pairs += [(reference, rigid)]
 
-                if rigid is None:
-                    continue
+        commands.create_active_controls(pairs)
 
-                commands.create_active_control(reference, rigid)
+        reference_proxies = []
 
+        with cmdx.DagModifier() as mod:
+            for reference, rigid in pairs:
                 mod.smart_set_attr(rigid["kinematic"], False)
-                mod.do_it()
+                mod.connect(reference["worldMatrix"][0], rigid["inputMatrix"])
 
                 # Forward kinematics from children too
-                reference_proxies = i__.UserAttributes(rigid, reference)
-                reference_proxies.add_divider("Ragdoll")
-                reference_proxies.add("kinematic")
-                reference_proxies.do_it()
+                proxies = i__.UserAttributes(rigid, reference)
+                proxies.add_divider("Ragdoll")
+                proxies.add("kinematic")
+                reference_proxies += [proxies]
 
-                mod.connect(reference["worldMatrix"][0], rigid["inputMatrix"])
+        i__.UserAttributes.do_many(reference_proxies)
 
     if normalise_shapes:
         commands.normalise_shapes(result)
@@ -1,5 +1,5 @@
 from ..vendor import cmdx
-from .. import commands, internal as i__
+from .. import commands, constants as c, internal as i__
 
 
 @i__.with_undo_chunk
@@ -18,112 +18,177 @@ def create(a,
 
     """
 
-    assert a and a.isA(cmdx.kTransform), "%s was not a transform" % a
-    assert b and b.isA(cmdx.kTransform), "%s was not a transform" % b
+    return create_many([(a, b)], scene,
+                       aim_axis=aim_axis,
+                       up_axis=up_axis,
+                       flex=flex,
+                       radius=radius)[0]
+
+
+@i__.with_undo_chunk
+@i__.with_unique_names
+def create_many(pairs,
+                scene,
+                aim_axis=None,
+                up_axis=None,
+                flex=0.75,
+                radius=1.0):
+    """Make one muscle per (a, b) pair of anchor points
+
+    Like calling :func:`create` per pair, except anchors are read once,
+    anchors shared between muscles get one passive rigid and everything
+    is created in a handful of modifiers.
+
+    Arguments:
+        pairs (list): Of (root anchor, tip anchor) transforms
+        scene (rdScene): Add every muscle to this scene
+
+    Returns:
+        muscles (list): Of (muscle, root constraint, tip constraint)
+
+    """
+
     assert scene and scene.type() == "rdScene", "%s was not an rdScene" % scene
 
+    for a, b in pairs:
+        assert a and a.isA(cmdx.kTransform), "%s was not a transform" % a
+        assert b and b.isA(cmdx.kTransform), "%s was not a transform" % b
+
     aim_axis = aim_axis or cmdx.Vector(1, 0, 0)
     up_axis = up_axis or commands.up_axis()
 
-    start = a.transform(cmdx.sWorld).translation()
-    end = b.transform(cmdx.sWorld).translation()
-    aim = (end - start).normal()
-    length = (end - start).length()
+    # Anchors and their parents, once each
+    anchors = {}
+    for a, b in pairs:
+        for node in (a, b, a.parent(), b.parent()):
+            anchors[node.hex] = node
+
+    # Read anchors up-front, before any physics is
+    # around that they could trigger an evaluation of
+    snapshot = i__.Snapshot()
+    snapshot.capture(anchors.values(), ("worldMatrix",))
+
+    frames = []
+    for a, b in pairs:
+        start = snapshot.transform(a).translation()
+        end = snapshot.transform(b).translation()
+        aim = (end - start).normal()
+        length = (end - start).length()
 
-    rotation = cmdx.Quat(aim_axis, aim)
+        rotation = cmdx.Quat(aim_axis, aim)
 
-    # Optional user-provided markup
-    flex = a["flex"].read() if "flex" in a else flex
-    radius = a["radius"].read() if "radius" in a else radius
+        # Optional user-provided markup
+        muscle_flex = a["flex"].read() if "flex" in a else flex
+        muscle_radius = a["radius"].read() if "radius" in a else radius
 
-    tm = cmdx.Tm()
-    tm.setRotation(rotation)
-    tm.setTranslation(start)
+        tm = cmdx.Tm()
+        tm.setRotation(rotation)
+        tm.setTranslation(start)
 
-    # Move root start towards centre
-    tm.translateBy(cmdx.Vector(length * (flex / 2), 0, 0), cmdx.sObject)
+        # Move root start towards centre
+        tm.translateBy(cmdx.Vector(length * (muscle_flex / 2), 0, 0),
+                       cmdx.sObject)
 
+        frames += [(tm, length, muscle_flex, muscle_radius)]
+
+    roots = []
     with cmdx.DagModifier() as mod:
-        root = mod.createNode("joint", name="root")
-        tip = mod.createNode("joint", name="tip", parent=root)
+        for tm, length, muscle_flex, muscle_radius in frames:
+            root = mod.createNode("joint", name="root")
+            tip = mod.createNode("joint", name="tip", parent=root)
 
-        mod.set_attr(root["radius"], radius)
-        mod.set_attr(tip["radius"], radius)
+            mod.set_attr(root["radius"], muscle_radius)
+            mod.set_attr(tip["radius"], muscle_radius)
 
-        mod.set_attr(root["translate"], tm.translation())
-        mod.set_attr(root["rotate"], tm.rotation())
-        mod.set_attr(tip["translateX"], length * (1 - flex))
+            mod.set_attr(root["translate"], tm.translation())
+            mod.set_attr(root["rotate"], tm.rotation())
+            mod.set_attr(tip["translateX"], length * (1 - muscle_flex))
 
-        mod.do_it()
+            roots += [root]
 
-        muscle = commands.create_rigid(root, scene)
+    muscles = commands.create_rigids(roots, scene, _cache=snapshot)
 
-        # These may be connected to user attributes
-        mod.smart_set_attr(muscle["linearDamping"], 2.0)
-        mod.smart_set_attr(muscle["friction"], 0.0)
-        mod.smart_set_attr(muscle["restitution"], 0.0)
+    # Anchor parents without a rigid get a passive one,
+    # shared by every muscle attached to it
+    passives = {}
+    missing = []
+    for a, b in pairs:
+        for parent in (a.parent(), b.parent()):
+            if parent.hex in passives:
+                continue
 
-    a_passive = a.parent().shape(type="rdRigid")
-    b_passive = b.parent().shape(type="rdRigid")
+            rigid = parent.shape(type="rdRigid")
+            passives[parent.hex] = rigid
 
-    if not a_passive:
-        a_passive = commands.create_passive_rigid(a.parent(), scene)
+            if rigid is None:
+                missing += [parent]
 
-    if not b_passive:
-        b_passive = commands.create_passive_rigid(b.parent(), scene)
+    if missing:
+        created = commands.create_rigids(missing, scene,
+                                         opts={"passive": True},
+                                         _cache=snapshot)
 
-    opts = {"maintainOffset": False}
-    con1 = commands.point_constraint(a_passive, muscle, opts=opts)
-    con2 = commands.point_constraint(b_passive, muscle, opts=opts)
+        for parent, rigid in zip(missing, created):
+            passives[parent.hex] = rigid
 
-    def parentframe_to_anchorpoints(mod):
-        # Move parent frames to anchor points
-        for anchor, constraint in ((a, con1), (b, con2)):
-            matrix = anchor.transform(cmdx.sWorld).asMatrix()
-            parent_matrix = anchor.parent().transform(cmdx.sWorld).asMatrix()
-            parent_frame = matrix * parent_matrix.inverse()
-            mod.set_attr(constraint["parentFrame"], parent_frame)
+    constraints = commands.create_constraints(
+        [(passives[anchor.parent().hex], muscle)
+         for (a, b), muscle in zip(pairs, muscles)
+         for anchor in (a, b)],
+        type=c.PointConstraint,
+        orient=False,
+        _cache=snapshot
+    )
 
-    def add_to_set(mod):
-        try:
-            collection = cmdx.encode("ragdollMuscles")
-        except cmdx.ExistError:
-            with cmdx.DGModifier() as mod:
-                collection = mod.create_node(
-                    "objectSet", name="ragdollMuscles"
-                )
+    lengths = [muscle["shapeLength"].read() for muscle in muscles]
+    results = []
 
-        collection.add(root)
+    with cmdx.DagModifier() as mod:
+        for index, ((a, b), muscle, (tm, _, _, _), length) in enumerate(
+                zip(pairs, muscles, frames, lengths)):
+            con1, con2 = constraints[index * 2:index * 2 + 2]
 
-    def lock_twist(mod):
-        # Lock twist, the muscle should really only rotate around Y and Z
-        # First we need to reorient root to aim in the direction of the muscle
+            # These may be connected to user attributes
+            mod.smart_set_attr(muscle["linearDamping"], 2.0)
+            mod.smart_set_attr(muscle["friction"], 0.0)
+            mod.smart_set_attr(muscle["restitution"], 0.0)
 
-        mtm = muscle.transform(cmdx.sWorld).asMatrix()
-        atm = a.parent().transform(cmdx.sWorld).asMatrix()
-        tm = cmdx.Tm(mtm * atm.inverse())
+            # Move tip constraint to tip of muscle
+            child_frame = cmdx.Matrix4()
+            child_frame[4 * 3] = length  # Row 4, column 3 = Translate X
 
-        pftm = cmdx.Tm(con1["parentFrame"].asMatrix())
-        pftm.setRotation(tm.rotation(asQuaternion=True))
-        mod.set_attr(con1["parentFrame"], pftm.asMatrix())
-        mod.set_attr(con1["angularLimitX"], cmdx.radians(-1))
+            mod.set_attr(con2["childFrame"], child_frame)
 
-    with cmdx.DagModifier() as mod:
+            # Move parent frames to anchor points
+            parent_frames = []
+            for anchor, con in ((a, con1), (b, con2)):
+                matrix = snapshot[(anchor, "worldMatrix")]
+                parent_matrix = snapshot[(anchor.parent(), "worldMatrix")]
+                parent_frames += [matrix * parent_matrix.inverse()]
+
+                mod.set_attr(con["linearLimit"], 0.01)
+                mod.set_attr(con["linearLimitStiffness"], 500)
+                mod.set_attr(con["linearLimitDamping"], 10)
+
+            # Lock twist, the muscle should really only rotate around Y
+            # and Z. First we need to reorient root to aim in the
+            # direction of the muscle
+            atm = snapshot[(a.parent(), "worldMatrix")]
+            twist = cmdx.Tm(tm.asMatrix() * atm.inverse())
+
+            pftm = cmdx.Tm(parent_frames[0])
+            pftm.setRotation(twist.rotation(asQuaternion=True))
 
-        # Move tip constraint to tip of muscle
-        length = muscle["shapeLength"].read()
-        child_frame = cmdx.Matrix4()
-        child_frame[4 * 3] = length  # Row 4, column 3 = Translate X
+            mod.set_attr(con1["parentFrame"], pftm.asMatrix())
+            mod.set_attr(con2["parentFrame"], parent_frames[1])
+            mod.set_attr(con1["angularLimitX"], cmdx.radians(-1))
 
-        mod.set_attr(con2["childFrame"], child_frame)
+            results += [(muscle, con1, con2)]
 
-        for con in (con1, con2):
-            mod.set_attr(con["linearLimit"], 0.01)
-            mod.set_attr(con["linearLimitStiffness"], 500)
-            mod.set_attr(con["linearLimitDamping"], 10)
+    if roots:
+        collection = i__.add_to_set(roots[0], "ragdollMuscles")
 
-        parentframe_to_anchorpoints(mod)
-        lock_twist(mod)
-        add_to_set(mod)
+        if len(roots) > 1:
+            collection.update(roots[1:])
 
-    return muscle, con1, con2
+    return results
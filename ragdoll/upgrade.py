@@ -30,9 +30,6 @@ RAGDOLL_PLUGIN_NAME = os.path.basename(RAGDOLL_PLUGIN)
 @internal.with_undo_chunk
 def upgrade_all():
 
-    # Fetch node types from the horses mouth
-    all_nodetypes = cmds.pluginInfo("ragdoll", query=True, dependNode=True)
-
     # Also fetch plug-in version from the same mouth, rather
     # than rely on what's coming out of interactive.py. Since
     # upgrading should work headless too!
@@ -51,7 +48,7 @@ def upgrade_all():
 
     upgraded_count = 0
 
-    for node in cmdx.ls(type=all_nodetypes):
+    for node in internal.node_index.ls():
         node_version = node["version"].read()
 
         func = nodetype_to_upgrade.get(node.type())
@@ -83,9 +80,7 @@ def needs_upgrade(current_version):
     oldest_version = current_version
 
     # Evaluate all node types defined by Ragdoll
-    all_nodetypes = cmds.pluginInfo("ragdoll", query=True, dependNode=True)
-
-    for node in cmdx.ls(type=all_nodetypes):
+    for node in internal.node_index.ls():
         node_version = node["version"].read()
 
         if has_upgrade(node, node_version):